@@ -1,34 +1,104 @@
 """"Implementation of a singly linked list with various operations."""
+import heapq
+import operator
+import random
+import time
+import tracemalloc
+from array import array
+import numpy as np
+
+# Lists up to this length are always sorted with insertion sort
+INSERTION_SORT_THRESHOLD = 16
+# Empty link in CompactLinkedList
+NIL = -1
+# Array typecodes of CompactLinkedList that sort as NumPy arrays
+NUMERIC_TYPECODES = "bBhHiIlLqQfd"
 
 
 class Node:
     """A class for a node in a singly linked list."""
+    __slots__ = ("data", "next")
+
     def __init__(self, data=None):
         self.data = data
         self.next = None
 
 
 class LinkedList:
-    """A class for singly linked list with various operations."""
-    def __init__(self):
+    """
+    A class for singly linked list with various operations.
+    With indexed=True the list keeps a hash index from value to its
+    nodes (in list order) and to each node's predecessor, which makes
+    search_element and delete_node O(1) on average. Indexed lists
+    require hashable values.
+    """
+    def __init__(self, indexed: bool = False):
         self.head = None
+        self.tail = None
+        self.length = 0
+        # value -> nodes holding it in list order, node -> previous node
+        self._index = None
+        self._prev = None
+        if indexed:
+            self.enable_index()
+
+    def __len__(self):
+        return self.length
+
+    def __iter__(self):
+        current = self.head
+        while current:
+            yield current.data
+            current = current.next
+
+    @property
+    def indexed(self) -> bool:
+        """Whether the value index is maintained."""
+        return self._index is not None
+
+    def enable_index(self):
+        """Build the value index and keep it updated from now on."""
+        self._index = {}
+        self._prev = {}
+        prev = None
+        current = self.head
+        while current:
+            self._index.setdefault(current.data, []).append(current)
+            self._prev[current] = prev
+            prev = current
+            current = current.next
+
+    def disable_index(self):
+        """Drop the value index and fall back to linear scans."""
+        self._index = None
+        self._prev = None
 
     def insert_at_beginning(self, data):
         """Insert a new node at the beginning of the linked list."""
         new_node = Node(data)
         new_node.next = self.head
         self.head = new_node
+        if self.tail is None:
+            self.tail = new_node
+        self.length += 1
+        if self._index is not None:
+            self._index.setdefault(data, []).insert(0, new_node)
+            self._prev[new_node] = None
+            if new_node.next:
+                self._prev[new_node.next] = new_node
 
     def insert_at_end(self, data):
-        """Insert a new node at the end of the linked list."""
+        """Insert a new node at the end of the linked list in O(1)."""
         new_node = Node(data)
+        if self._index is not None:
+            self._index.setdefault(data, []).append(new_node)
+            self._prev[new_node] = self.tail
         if self.head is None:
             self.head = new_node
         else:
-            cur = self.head
-            while cur.next:
-                cur = cur.next
-            cur.next = new_node
+            self.tail.next = new_node
+        self.tail = new_node
+        self.length += 1
 
     def insert_after(self, prev_node: Node, data):
         """Insert a new node after the given prev_node."""
@@ -38,12 +108,32 @@ class LinkedList:
         new_node = Node(data)
         new_node.next = prev_node.next
         prev_node.next = new_node
+        if prev_node is self.tail:
+            self.tail = new_node
+        self.length += 1
+        if self._index is not None:
+            self._prev[new_node] = prev_node
+            if new_node.next:
+                self._prev[new_node.next] = new_node
+            if data in self._index:
+                # Position among duplicates is unknown: re-collect them
+                self._index[data] = [
+                    node for node in self._iter_nodes() if node.data == data
+                ]
+            else:
+                self._index[data] = [new_node]
 
     def delete_node(self, key: int):
         """Delete the first occurrence of key in the linked list."""
+        if self._index is not None:
+            self._delete_indexed(key)
+            return
         cur = self.head
         if cur and cur.data == key:
             self.head = cur.next
+            if self.head is None:
+                self.tail = None
+            self.length -= 1
             cur = None
             return
         prev = None
@@ -53,10 +143,42 @@ class LinkedList:
         if cur is None:
             return
         prev.next = cur.next
+        if cur is self.tail:
+            self.tail = prev
+        self.length -= 1
         cur = None
 
+    def _delete_indexed(self, key):
+        """Unlink the first node holding key using the value index."""
+        nodes = self._index.get(key)
+        if not nodes:
+            return
+        cur = nodes.pop(0)
+        if not nodes:
+            del self._index[key]
+        prev = self._prev.pop(cur)
+        if prev is None:
+            self.head = cur.next
+        else:
+            prev.next = cur.next
+        if cur.next:
+            self._prev[cur.next] = prev
+        if cur is self.tail:
+            self.tail = prev
+        self.length -= 1
+
+    def _iter_nodes(self):
+        """Iterate over the nodes of the linked list."""
+        current = self.head
+        while current:
+            yield current
+            current = current.next
+
     def search_element(self, data: int) -> Node | None:
         """Search for an element in the linked list."""
+        if self._index is not None:
+            nodes = self._index.get(data)
+            return nodes[0] if nodes else None
         cur = self.head
         while cur:
             if cur.data == data:
@@ -75,29 +197,45 @@ class LinkedList:
         """Reverse the linked list in place."""
         prev = None
         current = self.head
+        self.tail = current
         while current:
             next_node = current.next
             current.next = prev
             prev = current
             current = next_node
         self.head = prev
+        if self._index is not None:
+            self.enable_index()
 
-    def insertion_sort(self):
-        """Sort the linked list using insertion sort algorithm."""
+    def insertion_sort(self, key=None, reverse=False):
+        """
+        Sort the linked list using stable insertion sort algorithm.
+        Nodes that do not precede the current tail are appended in O(1),
+        so nearly sorted lists are sorted in close to linear time.
+        Args:
+            key: function extracting a comparison key from each element
+            reverse: sort in descending order
+        """
         if self.head is None or self.head.next is None:
             return
+        before = _precedes(key, reverse)
 
-        sorted_head = None
-        current = self.head
+        sorted_head = sorted_tail = self.head
+        current = self.head.next
+        sorted_tail.next = None
         while current:
             next_node = current.next
 
-            if sorted_head is None or current.data < sorted_head.data:
+            if not before(current.data, sorted_tail.data):
+                sorted_tail.next = current
+                sorted_tail = current
+                current.next = None
+            elif before(current.data, sorted_head.data):
                 current.next = sorted_head
                 sorted_head = current
             else:
                 temp = sorted_head
-                while temp.next and temp.next.data < current.data:
+                while not before(current.data, temp.next.data):
                     temp = temp.next
                 current.next = temp.next
                 temp.next = current
@@ -105,13 +243,320 @@ class LinkedList:
             current = next_node
 
         self.head = sorted_head
+        self.tail = sorted_tail
+        if self._index is not None:
+            self.enable_index()
 
+    def merge_sort(self, key=None, reverse=False):
+        """
+        Sort the linked list using stable bottom-up merge sort.
+        Nodes are relinked in place: O(n log n) time, O(1) extra memory
+        and no recursion.
+        Args:
+            key: function extracting a comparison key from each element
+            reverse: sort in descending order
+        """
+        if self.head is None or self.head.next is None:
+            return
+        before = _precedes(key, reverse)
 
-def merge_lists(list1: LinkedList, list2: LinkedList) -> LinkedList:
-    """Merge two sorted linked lists into a single sorted linked list."""
-    merged_list = LinkedList()
+        dummy = Node()
+        dummy.next = self.head
+        width = 1
+        while width < self.length:
+            tail = dummy
+            current = dummy.next
+            while current:
+                left = current
+                right = _split_run(left, width)
+                current = _split_run(right, width)
+                tail = _merge_runs(left, right, tail, before)
+            width *= 2
+
+        self.head = dummy.next
+        self.tail = tail
+        if self._index is not None:
+            self.enable_index()
+
+    def sort(self, key=None, reverse=False):
+        """
+        Sort the linked list in place, stable, like list.sort().
+        Short or nearly sorted lists go to insertion_sort, others to
+        merge_sort. The choice is made by one probe pass that counts
+        elements out of order relative to the largest element so far.
+        Args:
+            key: function extracting a comparison key from each element
+            reverse: sort in descending order
+        """
+        if self.head is None or self.head.next is None:
+            return
+        before = _precedes(key, reverse)
+
+        # Every displaced element costs insertion sort a walk from head
+        limit = max(self.length.bit_length(), INSERTION_SORT_THRESHOLD)
+        displaced = 0
+        largest = self.head
+        current = self.head.next
+        while current and displaced <= limit:
+            if before(current.data, largest.data):
+                displaced += 1
+            else:
+                largest = current
+            current = current.next
+
+        if displaced == 0:
+            return
+        if (self.length <= INSERTION_SORT_THRESHOLD
+                or displaced <= self.length.bit_length()):
+            self.insertion_sort(key, reverse)
+        else:
+            self.merge_sort(key, reverse)
+
+
+class CompactLinkedList:
+    """
+    Singly linked list stored in parallel typed arrays.
+    Values and next indices live in array buffers instead of Node
+    objects, and nodes are addressed by their integer slot. Deleted
+    slots are chained into a free-list and reused by later inserts.
+    """
+    def __init__(self, typecode: str = "q"):
+        self.values = array(typecode)
+        self.next = array("q")
+        self.head = NIL
+        self.tail = NIL
+        self.length = 0
+        self.free = NIL
+
+    def __len__(self):
+        return self.length
+
+    def __iter__(self):
+        values = self.values
+        links = self.next
+        current = self.head
+        while current != NIL:
+            yield values[current]
+            current = links[current]
+
+    def _allocate(self, data) -> int:
+        """Store data in a free slot (or a new one) and return the slot."""
+        slot = self.free
+        if slot == NIL:
+            self.values.append(data)
+            self.next.append(NIL)
+            return len(self.next) - 1
+        self.free = self.next[slot]
+        self.values[slot] = data
+        self.next[slot] = NIL
+        return slot
+
+    def data(self, slot: int):
+        """Return the value stored in the given slot."""
+        return self.values[slot]
+
+    def insert_at_beginning(self, data):
+        """Insert a new node at the beginning of the linked list."""
+        slot = self._allocate(data)
+        self.next[slot] = self.head
+        self.head = slot
+        if self.tail == NIL:
+            self.tail = slot
+        self.length += 1
+
+    def insert_at_end(self, data):
+        """Insert a new node at the end of the linked list in O(1)."""
+        slot = self._allocate(data)
+        if self.head == NIL:
+            self.head = slot
+        else:
+            self.next[self.tail] = slot
+        self.tail = slot
+        self.length += 1
+
+    def insert_after(self, prev_node: int | None, data):
+        """Insert a new node after the node in slot prev_node."""
+        if prev_node is None or prev_node == NIL:
+            print("Previous node does not exist.")
+            return
+        slot = self._allocate(data)
+        self.next[slot] = self.next[prev_node]
+        self.next[prev_node] = slot
+        if prev_node == self.tail:
+            self.tail = slot
+        self.length += 1
+
+    def delete_node(self, key):
+        """Delete the first occurrence of key in the linked list."""
+        values = self.values
+        links = self.next
+        prev = NIL
+        cur = self.head
+        while cur != NIL and values[cur] != key:
+            prev = cur
+            cur = links[cur]
+        if cur == NIL:
+            return
+        if prev == NIL:
+            self.head = links[cur]
+        else:
+            links[prev] = links[cur]
+        if cur == self.tail:
+            self.tail = prev
+        # Put the slot on the free-list
+        links[cur] = self.free
+        self.free = cur
+        self.length -= 1
+
+    def search_element(self, data) -> int | None:
+        """Search for an element and return its slot."""
+        values = self.values
+        links = self.next
+        cur = self.head
+        while cur != NIL:
+            if values[cur] == data:
+                return cur
+            cur = links[cur]
+        return None
+
+    def print_list(self):
+        """Print all elements in the linked list."""
+        for data in self:
+            print(data)
+
+    def reverse_list(self):
+        """Reverse the linked list in place."""
+        links = self.next
+        prev = NIL
+        current = self.head
+        self.tail = current
+        while current != NIL:
+            next_node = links[current]
+            links[current] = prev
+            prev = current
+            current = next_node
+        self.head = prev
+
+    def sort(self, key=None, reverse=False):
+        """
+        Sort the linked list, stable, like list.sort().
+        Values are sorted in list order and written back into contiguous
+        slots, which also compacts away the free-list. Numeric values
+        without key are gathered into a NumPy array and sorted there, so
+        no Python objects are created for them.
+        Args:
+            key: function extracting a comparison key from each element
+            reverse: sort in descending order
+        """
+        typecode = self.values.typecode
+        if key is None and typecode in NUMERIC_TYPECODES:
+            ordered = np.fromiter(self, dtype=typecode, count=self.length)
+            # Sorting the reversed view keeps equal values stable
+            (ordered[::-1] if reverse else ordered).sort(kind="stable")
+            self.values = array(typecode)
+            self.values.frombytes(memoryview(ordered).cast("B"))
+        else:
+            self.values = array(typecode,
+                                sorted(self, key=key, reverse=reverse))
+        size = len(self.values)
+        self.next = array("q")
+        self.next.frombytes(
+            memoryview(np.arange(1, size + 1, dtype="q")).cast("B")
+        )
+        self.free = NIL
+        if size:
+            self.next[-1] = NIL
+            self.head = 0
+            self.tail = size - 1
+        else:
+            self.head = self.tail = NIL
+
+
+def _precedes(key, reverse):
+    """Return a strict 'goes before' predicate for the sort order."""
+    if key is None:
+        return operator.gt if reverse else operator.lt
+    if reverse:
+        return lambda a, b: key(a) > key(b)
+    return lambda a, b: key(a) < key(b)
+
+
+def _split_run(head: Node | None, size: int) -> Node | None:
+    """Cut the list after size nodes and return the head of the rest."""
+    for _ in range(size - 1):
+        if head is None:
+            return None
+        head = head.next
+    if head is None:
+        return None
+    rest = head.next
+    head.next = None
+    return rest
+
+
+def _merge_runs(left: Node | None, right: Node | None,
+                tail: Node, before) -> Node:
+    """Link two sorted runs after tail and return the new tail."""
+    while left and right:
+        # Take from the right run only if strictly before: keeps stability
+        if before(right.data, left.data):
+            tail.next = right
+            right = right.next
+        else:
+            tail.next = left
+            left = left.next
+        tail = tail.next
+    tail.next = left or right
+    while tail.next:
+        tail = tail.next
+    return tail
+
+
+def merge_lists(list1: LinkedList, list2: LinkedList,
+                in_place: bool = False) -> LinkedList:
+    """
+    Merge two sorted linked lists into a single sorted linked list.
+    Runs in O(n + m): values are appended through the tail of the result.
+    The result is indexed if either input list is indexed.
+    Args:
+        list1: first sorted linked list
+        list2: second sorted linked list
+        in_place: splice the existing nodes instead of copying values.
+                  No new nodes are allocated and both input lists are
+                  left empty.
+    Returns:
+        merged sorted linked list
+    """
+    merged_list = LinkedList(indexed=list1.indexed or list2.indexed)
     current1 = list1.head
     current2 = list2.head
+
+    if in_place:
+        merged_list.length = list1.length + list2.length
+        for source in (list1, list2):
+            source.head = source.tail = None
+            source.length = 0
+            if source.indexed:
+                source.enable_index()
+        # Dummy node keeps the splice loop free of head special cases
+        tail = dummy = Node()
+        while current1 and current2:
+            if current1.data < current2.data:
+                tail.next = current1
+                current1 = current1.next
+            else:
+                tail.next = current2
+                current2 = current2.next
+            tail = tail.next
+        tail.next = current1 or current2
+        while tail.next:
+            tail = tail.next
+        merged_list.head = dummy.next
+        merged_list.tail = tail if merged_list.head else None
+        if merged_list.indexed:
+            merged_list.enable_index()
+        return merged_list
+
     while current1 and current2:
         if current1.data < current2.data:
             merged_list.insert_at_end(current1.data)
@@ -129,6 +574,102 @@ def merge_lists(list1: LinkedList, list2: LinkedList) -> LinkedList:
     return merged_list
 
 
+def iter_merge_many(lists, key=None):
+    """
+    Lazily merge any number of sorted linked lists or iterables.
+    A heap holds one pending element per input, so merging N elements
+    from k inputs takes O(N log k) time and O(k) memory. Ties are taken
+    from the earlier input first.
+    Args:
+        lists: sorted LinkedList objects or any sorted iterables
+        key: function extracting a comparison key from each element
+    Yields:
+        elements of all inputs in sorted order
+    """
+    yield from heapq.merge(*lists, key=key)
+
+
+def merge_many(lists, key=None) -> LinkedList:
+    """
+    Merge any number of sorted linked lists or iterables into a new
+    sorted linked list in O(N log k).
+    Args:
+        lists: sorted LinkedList objects or any sorted iterables
+        key: function extracting a comparison key from each element
+    Returns:
+        merged sorted linked list
+    """
+    merged_list = LinkedList()
+    for data in iter_merge_many(lists, key=key):
+        merged_list.insert_at_end(data)
+    return merged_list
+
+
+def benchmark_merge(sizes=(1_000, 10_000, 100_000, 1_000_000)) -> None:
+    """
+    Measure merge_lists on two sorted lists of each size and print
+    timings. Time per element stays flat when merging scales linearly.
+    Args:
+        sizes: number of elements in each of the two merged lists
+    Returns:
+        None
+    """
+    print(f"{'size':>10} {'copy, s':>10} {'splice, s':>10} {'ns/elem':>8}")
+    for size in sizes:
+        timings = []
+        for in_place in (False, True):
+            list1 = LinkedList()
+            list2 = LinkedList()
+            for i in range(size):
+                list1.insert_at_end(2 * i)
+                list2.insert_at_end(2 * i + 1)
+            start = time.perf_counter()
+            merge_lists(list1, list2, in_place=in_place)
+            timings.append(time.perf_counter() - start)
+        per_element = timings[0] / (2 * size) * 1e9
+        print(f"{size:>10} {timings[0]:>10.4f} {timings[1]:>10.4f} "
+              f"{per_element:>8.1f}")
+
+
+def benchmark_compact(size: int = 1_000_000) -> None:
+    """
+    Compare memory and throughput of LinkedList and CompactLinkedList.
+    Args:
+        size: number of integer elements in each list
+    Returns:
+        None
+    """
+    values = list(range(size))
+    random.Random(0).shuffle(values)
+    print(f"{'class':>18} {'MiB':>8} {'build, s':>9} "
+          f"{'search, s':>10} {'sort, s':>8}")
+    for cls in (LinkedList, CompactLinkedList):
+        # Tracing slows allocations down, so memory gets its own pass
+        tracemalloc.start()
+        linked_list = cls()
+        for data in values:
+            linked_list.insert_at_end(data)
+        memory = tracemalloc.get_traced_memory()[0] / 2 ** 20
+        tracemalloc.stop()
+        del linked_list
+
+        start = time.perf_counter()
+        linked_list = cls()
+        for data in values:
+            linked_list.insert_at_end(data)
+        build = time.perf_counter() - start
+
+        start = time.perf_counter()
+        linked_list.search_element(values[-1])
+        search = time.perf_counter() - start
+
+        start = time.perf_counter()
+        linked_list.sort()
+        sort = time.perf_counter() - start
+        print(f"{cls.__name__:>18} {memory:>8.1f} {build:>9.3f} "
+              f"{search:>10.3f} {sort:>8.3f}")
+
+
 def main():
     """Main function to demonstrate linked list operations."""
     list1 = LinkedList()
@@ -139,7 +680,7 @@ def main():
     list1.insert_at_end(32)
     print("List 1 before sorting:")
     list1.print_list()
-    list1.insertion_sort()
+    list1.sort()
     print("List 1 after sorting:")
     list1.print_list()
 
@@ -149,7 +690,7 @@ def main():
     list2.insert_at_end(-99)
     list2.insert_at_end(123)
     list2.print_list()
-    list2.insertion_sort()
+    list2.sort()
     print("List 2 after sorting:")
     list2.print_list()
 
@@ -1,11 +1,95 @@
 """Implementation of a Pythagoras Tree fractal using turtle graphics."""
 import math
+import os
 import turtle
+import numpy as np
+from matplotlib.colors import to_rgb
+from matplotlib.image import imsave
+
+# A child branch is its parent turned by 45 degrees and scaled by
+# sqrt(2)/2, i.e. the parent vector multiplied by (1 +- 1j) / 2
+LEFT_TURN = (1 + 1j) / 2
+RIGHT_TURN = (1 - 1j) / 2
+# Default number of segments processed at once when rendering to file
+MAX_BATCH = 65536
+
+
+def pythagoras_levels(length: float, depth: int, origin=(0, 0),
+                      heading: float = 90, max_batch: int | None = None):
+    """
+    Generates Pythagoras Tree segments level by level without recursion.
+    Every level is computed from the previous one with a single batched
+    rotate-and-scale of all branch vectors.
+    Args:
+        length: length of the first branch
+        depth: number of levels
+        origin: (x, y) start point of the first branch
+        heading: direction of the first branch in degrees
+        max_batch: if set, a level wider than max_batch is split into
+                   batches that are expanded one after another, so
+                   memory stays around max_batch * depth segments
+    Yields:
+        array of shape (n, 2, 2) with [[x0, y0], [x1, y1]] endpoints
+        of a whole level (or of one batch of it)
+    """
+    starts = np.array([complex(*origin)])
+    vectors = np.array([length * np.exp(1j * math.radians(heading))])
+    stack = [(starts, vectors, depth)] if depth > 0 else []
+    while stack:
+        starts, vectors, remaining = stack.pop()
+        ends = starts + vectors
+        yield np.stack(
+            (np.column_stack((starts.real, starts.imag)),
+             np.column_stack((ends.real, ends.imag))),
+            axis=1
+        )
+        if remaining > 1:
+            starts = np.concatenate((ends, ends))
+            vectors = np.concatenate((vectors * LEFT_TURN,
+                                      vectors * RIGHT_TURN))
+            batch = max_batch or len(starts)
+            # Push in reverse so the first batch is expanded first
+            for i in reversed(range(0, len(starts), batch)):
+                stack.append((starts[i:i + batch], vectors[i:i + batch],
+                              remaining - 1))
+
+
+def pythagoras_segments(length: float, depth: int, origin=(0, 0),
+                        heading: float = 90) -> np.ndarray:
+    """
+    Computes all Pythagoras Tree segments at once.
+    Args:
+        length: length of the first branch
+        depth: number of levels
+        origin: (x, y) start point of the first branch
+        heading: direction of the first branch in degrees
+    Returns:
+        array of shape (2 ** depth - 1, 2, 2) with segment endpoints
+    """
+    if depth <= 0:
+        return np.empty((0, 2, 2))
+    return np.concatenate(
+        list(pythagoras_levels(length, depth, origin, heading))
+    )
+
+
+def draw_segments(t: turtle.Turtle, segments: np.ndarray):
+    """
+    Draws precomputed segments with turtle.
+    Args:
+        t: turtle.Turtle instance
+        segments: array of shape (n, 2, 2) with segment endpoints
+    """
+    for (x0, y0), (x1, y1) in segments.tolist():
+        t.penup()
+        t.goto(x0, y0)
+        t.pendown()
+        t.goto(x1, y1)
 
 
 def pythagoras_tree(t: turtle.Turtle, length: int, depth: int):
     """
-    Draws a Pythagoras Tree-like fractal using recursion.
+    Draws a Pythagoras Tree-like fractal from the turtle position.
     Args:
         t: turtle.Turtle instance
         length: branch length
@@ -14,20 +98,129 @@ def pythagoras_tree(t: turtle.Turtle, length: int, depth: int):
     if depth == 0:
         return
 
-    # Draw main branch
-    t.forward(length)
+    origin = t.position()
+    heading = t.heading()
+    pen_down = t.isdown()
+    for segments in pythagoras_levels(length, depth, origin, heading):
+        draw_segments(t, segments)
 
-    # Left branch
-    t.left(45)
-    pythagoras_tree(t, length * math.sqrt(2) / 2, depth - 1)
+    # Restore orientation and position
+    t.penup()
+    t.goto(origin)
+    t.setheading(heading)
+    if pen_down:
+        t.pendown()
 
-    # Right branch
-    t.right(90)
-    pythagoras_tree(t, length * math.sqrt(2) / 2, depth - 1)
 
-    # Restore orientation and position
-    t.left(45)
-    t.backward(length)
+def tree_bounds(length: float, depth: int,
+                max_batch: int = MAX_BATCH) -> tuple[float, ...]:
+    """
+    Computes the bounding box of a Pythagoras Tree in one streaming pass.
+    Returns:
+        (xmin, ymin, xmax, ymax)
+    """
+    xmin = ymin = math.inf
+    xmax = ymax = -math.inf
+    for segments in pythagoras_levels(length, depth, max_batch=max_batch):
+        points = segments.reshape(-1, 2)
+        xmin, ymin = np.minimum((xmin, ymin), points.min(axis=0))
+        xmax, ymax = np.maximum((xmax, ymax), points.max(axis=0))
+    return float(xmin), float(ymin), float(xmax), float(ymax)
+
+
+def render(depth: int, length: float, out_path: str, format=None,
+           size: int = 900, color: str = "firebrick",
+           max_batch: int = MAX_BATCH):
+    """
+    Renders a Pythagoras Tree to an image file without turtle or display.
+    Segments are streamed batch by batch into the output, so memory does
+    not grow with the total number of segments.
+    Args:
+        depth: number of levels
+        length: length of the first branch
+        out_path: output file path
+        format: "png" or "svg", by default taken from out_path suffix
+        size: image width and height in pixels
+        color: line color
+        max_batch: largest number of segments processed at once
+    Raises:
+        ValueError: if the format is not supported or depth is below 1
+    """
+    fmt = (format or os.path.splitext(out_path)[1].lstrip(".")).lower()
+    if fmt not in ("png", "svg"):
+        raise ValueError(f"Unsupported format: '{fmt}'")
+    if depth < 1:
+        raise ValueError(f"Depth must be at least 1, got {depth}")
+    bounds = tree_bounds(length, depth, max_batch)
+    levels = pythagoras_levels(length, depth, max_batch=max_batch)
+    if fmt == "svg":
+        _write_svg(levels, bounds, out_path, size, color)
+    else:
+        _write_png(levels, bounds, out_path, size, color, max_batch)
+
+
+def _pixel_transform(bounds, size):
+    """
+    Scale and offset that fit bounds centred into a size x size canvas:
+    pixel = (point - (xmin, ymin)) * scale + offset.
+    """
+    xmin, ymin, xmax, ymax = bounds
+    margin = 2
+    scale = (size - 2 * margin - 1) / max(xmax - xmin, ymax - ymin, 1e-9)
+    offset = (size - 1 - np.array((xmax - xmin, ymax - ymin)) * scale) / 2
+    return scale, offset
+
+
+def _write_svg(levels, bounds, out_path, size, color):
+    """
+    Streams segments into an SVG file, one path element per batch.
+    Coordinates are written in pixels of the canvas, so their precision
+    doesn't depend on the tree size.
+    """
+    scale, offset = _pixel_transform(bounds, size)
+    with open(out_path, "w", encoding="utf-8") as file:
+        file.write(
+            '<svg xmlns="http://www.w3.org/2000/svg" '
+            f'width="{size}" height="{size}" '
+            f'viewBox="0 0 {size} {size}">\n'
+        )
+        for segments in levels:
+            points = (segments - bounds[:2]) * scale + offset
+            # SVG y axis points down
+            points[..., 1] = size - 1 - points[..., 1]
+            coords = points.reshape(-1, 4)
+            path = "".join(
+                f"M{x0:.2f} {y0:.2f}L{x1:.2f} {y1:.2f}"
+                for x0, y0, x1, y1 in coords.tolist()
+            )
+            file.write(
+                f'<path d="{path}" stroke="{color}" fill="none" '
+                'vector-effect="non-scaling-stroke"/>\n'
+            )
+        file.write("</svg>\n")
+
+
+def _write_png(levels, bounds, out_path, size, color, max_batch):
+    """Rasterizes segments into a fixed-size pixel mask and saves PNG."""
+    xmin, ymin = bounds[:2]
+    scale, offset = _pixel_transform(bounds, size)
+    mask = np.zeros((size, size), dtype=bool)
+    for segments in levels:
+        starts = (segments[:, 0] - (xmin, ymin)) * scale + offset
+        deltas = (segments[:, 1] - segments[:, 0]) * scale
+        # Sample every segment about once per pixel along its length
+        samples = int(np.ceil(np.abs(deltas).max())) + 2
+        steps = np.linspace(0, 1, samples)
+        chunk = max(1, max_batch * 4 // samples)
+        for i in range(0, len(starts), chunk):
+            points = (starts[i:i + chunk, None, :]
+                      + deltas[i:i + chunk, None, :] * steps[:, None])
+            cols = np.rint(points[..., 0]).astype(np.intp)
+            rows = size - 1 - np.rint(points[..., 1]).astype(np.intp)
+            mask[rows.clip(0, size - 1), cols.clip(0, size - 1)] = True
+    image = np.full((size, size, 3), 255, dtype=np.uint8)
+    image[mask] = np.rint(np.array(to_rgb(color)) * 255).astype(np.uint8)
+    imsave(out_path, image)
 
 
 def main():
@@ -35,6 +228,8 @@ def main():
     screen = turtle.Screen()
     screen.setup(width=900, height=900)
     screen.bgcolor("white")
+    # Draw off-screen and show the finished picture at once
+    screen.tracer(0)
 
     t = turtle.Turtle()
     t.hideturtle()
@@ -55,6 +250,7 @@ def main():
     # Draw crown
     pythagoras_tree(t, length=200, depth=8)
 
+    screen.update()
     screen.mainloop()
 
 
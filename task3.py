@@ -3,30 +3,226 @@ Dijkstra's algorithm with heap.
 This implementation uses a min-heap to store the vertices and their distances.
 """
 import heapq
+import os
+import random
+import time
+from collections import OrderedDict, namedtuple
+from collections.abc import Mapping
+from itertools import chain, compress, repeat
+from multiprocessing import Pool
+from multiprocessing.shared_memory import SharedMemory
+import numpy as np
 import networkx as nx
 import matplotlib.pyplot as plt
 
+# Number of reverse graphs kept by bidirectional_dijkstra
+REVERSE_CACHE_SIZE = 8
+_REVERSE_CACHE = OrderedDict()
+CacheInfo = namedtuple("CacheInfo", ["hits", "misses", "maxsize", "currsize"])
+# Shared CSR arrays of the graph, set in every multi_source_distances worker
+_WORKER_GRAPH = {}
 
-def dijkstra_heap(graph, start):
+
+class PreparedGraph(Mapping):
+    """
+    Adjacency list validated once and frozen for repeated searches.
+    Negative weights and edges to unknown vertices are handled up front
+    under the chosen policies, so dijkstra_heap over a PreparedGraph
+    only relaxes edges. It is a read-only mapping
+    {node: ((neighbor, weight), ...)} accepted wherever the plain
+    adjacency list is.
+    """
+    def __init__(self, graph, negative: str = "raise",
+                 dangling: str = "skip"):
+        """
+        Args:
+            graph: adjacency list {node: [(neighbor, weight), ...]}
+            negative: "raise" on a negative weight or "drop" the edge
+            dangling: for neighbors that are not in the graph, "skip"
+                      the edge, "raise", or "add" the neighbor as a
+                      vertex without outgoing edges
+        Raises:
+            ValueError: on a negative weight or a dangling neighbor if
+                        the policy is "raise", or on an unknown policy
+        """
+        if negative not in ("raise", "drop"):
+            raise ValueError(f"Unknown negative weight policy: '{negative}'")
+        if dangling not in ("skip", "raise", "add"):
+            raise ValueError(f"Unknown dangling edge policy: '{dangling}'")
+
+        adjacency = {}
+        added = []
+        for vertex, edges in graph.items():
+            kept = []
+            for neighbor, weight in edges:
+                if neighbor not in graph:
+                    if dangling == "raise":
+                        raise ValueError(
+                            f"Dangling edge ({vertex}, {neighbor}): "
+                            f"'{neighbor}' not found in graph"
+                        )
+                    if dangling == "skip":
+                        continue
+                if weight < 0:
+                    if negative == "raise":
+                        raise ValueError(
+                            f"Negative weight detected: {weight} "
+                            f"on edge ({vertex}, {neighbor})"
+                        )
+                    continue
+                if neighbor not in graph:
+                    added.append(neighbor)
+                kept.append((neighbor, weight))
+            adjacency[vertex] = tuple(kept)
+        for vertex in added:
+            adjacency.setdefault(vertex, ())
+        self.adjacency = adjacency
+
+    def __getitem__(self, vertex):
+        return self.adjacency[vertex]
+
+    def __iter__(self):
+        return iter(self.adjacency)
+
+    def __len__(self):
+        return len(self.adjacency)
+
+    def __contains__(self, vertex):
+        return vertex in self.adjacency
+
+
+class IndexedHeap:
+    """
+    Addressable d-ary min-heap with decrease-key.
+    Every item is stored at most once; a position map finds it in O(1),
+    so its key can be lowered in place instead of pushing a duplicate.
+    """
+    def __init__(self, arity: int = 2):
+        """
+        Args:
+            arity: number of children per heap node (2 = binary heap)
+        """
+        if arity < 2:
+            raise ValueError("Heap arity must be at least 2")
+        self.arity = arity
+        self._keys = []
+        self._items = []
+        self._positions = {}
+
+    def __len__(self):
+        return len(self._items)
+
+    def __contains__(self, item):
+        return item in self._positions
+
+    def push(self, item, key) -> None:
+        """
+        Add item with the given key.
+        Raises:
+            ValueError: if item is already in the heap
+        """
+        if item in self._positions:
+            raise ValueError(f"Item '{item}' is already in the heap")
+        self._keys.append(key)
+        self._items.append(item)
+        self._positions[item] = len(self._items) - 1
+        self._sift_up(len(self._items) - 1)
+
+    def pop_min(self) -> tuple:
+        """
+        Remove and return (key, item) with the smallest key.
+        Raises:
+            IndexError: if the heap is empty
+        """
+        if not self._items:
+            raise IndexError("pop from empty heap")
+        key, item = self._keys[0], self._items[0]
+        last_key, last_item = self._keys.pop(), self._items.pop()
+        del self._positions[item]
+        if self._items:
+            self._keys[0], self._items[0] = last_key, last_item
+            self._positions[last_item] = 0
+            self._sift_down(0)
+        return key, item
+
+    def decrease_key(self, item, key) -> None:
+        """
+        Lower the key of an item already in the heap.
+        Raises:
+            KeyError:   if item is not in the heap
+            ValueError: if key is greater than the current key
+        """
+        position = self._positions[item]
+        if key > self._keys[position]:
+            raise ValueError("New key is greater than the current key")
+        self._keys[position] = key
+        self._sift_up(position)
+
+    def _sift_up(self, position: int) -> None:
+        """Move the entry at position up until its parent is smaller."""
+        keys, items, positions = self._keys, self._items, self._positions
+        key, item = keys[position], items[position]
+        while position > 0:
+            parent = (position - 1) // self.arity
+            if keys[parent] <= key:
+                break
+            keys[position], items[position] = keys[parent], items[parent]
+            positions[items[position]] = position
+            position = parent
+        keys[position], items[position] = key, item
+        positions[item] = position
+
+    def _sift_down(self, position: int) -> None:
+        """Move the entry at position down below its smaller children."""
+        keys, items, positions = self._keys, self._items, self._positions
+        size = len(keys)
+        key, item = keys[position], items[position]
+        while True:
+            first = position * self.arity + 1
+            if first >= size:
+                break
+            last = min(first + self.arity, size)
+            child = min(range(first, last), key=keys.__getitem__)
+            if keys[child] >= key:
+                break
+            keys[position], items[position] = keys[child], items[child]
+            positions[items[position]] = position
+            position = child
+        keys[position], items[position] = key, item
+        positions[item] = position
+
+
+def dijkstra_heap(graph, start, queue: str = "lazy", arity: int = 2):
     """
     Dijkstra's algorithm with heap
     Args:
         graph: adjacency list {node: [(neighbor, weight), ...]}
         start: starting vertex
+        queue: "lazy" pushes duplicate heap entries and skips outdated
+               ones, "indexed" uses IndexedHeap with decrease-key so
+               the heap never holds more than one entry per vertex
+        arity: children per heap node for the "indexed" queue
     Returns:
         distances: dictionary of distances to all vertices
     Raises:
         KeyError:   if start node is not in the graph
-        ValueError: if graph is empty or contains negative weights
+        ValueError: if graph is empty or contains negative weights,
+                    or queue is unknown
     """
     if not graph:
         raise ValueError("Graph cannot be empty")
     if start not in graph:
         raise KeyError(f"Start node '{start}' not found in graph")
+    if queue not in ("lazy", "indexed"):
+        raise ValueError(f"Unknown queue type: '{queue}'")
 
     # 1. Distances table
     distances = {v: float('inf') for v in graph}
     distances[start] = 0
+    if queue == "indexed":
+        return _dijkstra_indexed(graph, start, distances, arity)
+    if isinstance(graph, PreparedGraph):
+        return _dijkstra_prepared(graph.adjacency, start, distances)
 
     # 2. Min-heap (distance, vertex)
     heap = [(0, start)]
@@ -61,6 +257,940 @@ def dijkstra_heap(graph, start):
     return distances
 
 
+def _dijkstra_prepared(adjacency: dict, start, distances: dict) -> dict:
+    """Dijkstra's algorithm over a validated graph: relaxations only."""
+    heap = [(0, start)]
+
+    while heap:
+        current_dist, vertex = heapq.heappop(heap)
+        if current_dist > distances[vertex]:
+            continue
+        for neighbor, weight in adjacency[vertex]:
+            new_dist = current_dist + weight
+            if new_dist < distances[neighbor]:
+                distances[neighbor] = new_dist
+                heapq.heappush(heap, (new_dist, neighbor))
+
+    return distances
+
+
+def _dijkstra_indexed(graph, start, distances: dict, arity: int) -> dict:
+    """Dijkstra's algorithm over IndexedHeap with decrease-key."""
+    heap = IndexedHeap(arity)
+    heap.push(start, 0)
+
+    while heap:
+        current_dist, vertex = heap.pop_min()
+        for neighbor, weight in graph[vertex]:
+            if neighbor not in distances:
+                continue
+            if weight < 0:
+                raise ValueError(
+                    f"Negative weight detected: {weight} "
+                    f"on edge ({vertex}, {neighbor})"
+                )
+            new_dist = current_dist + weight
+            if new_dist < distances[neighbor]:
+                distances[neighbor] = new_dist
+                if neighbor in heap:
+                    heap.decrease_key(neighbor, new_dist)
+                else:
+                    heap.push(neighbor, new_dist)
+
+    return distances
+
+
+def shortest_path(graph, source, target,
+                  stats: dict | None = None) -> tuple[float, list]:
+    """
+    Dijkstra's algorithm for a single pair of vertices.
+    The search stops as soon as the target is settled.
+    Args:
+        graph: adjacency list {node: [(neighbor, weight), ...]}
+        source: starting vertex
+        target: destination vertex
+        stats: optional dict, receives the number of settled vertices
+               under the "settled" key
+    Returns:
+        (distance, path): path is the list of vertices from source to
+        target, or (inf, []) if target is unreachable
+    Raises:
+        KeyError:   if source or target node is not in the graph
+        ValueError: if graph is empty or contains negative weights
+    """
+    return a_star(graph, source, target, lambda vertex: 0, stats)
+
+
+def a_star(graph, source, target, heuristic,
+           stats: dict | None = None) -> tuple[float, list]:
+    """
+    A* search for a single pair of vertices.
+    Args:
+        graph: adjacency list {node: [(neighbor, weight), ...]}
+        source: starting vertex
+        target: destination vertex
+        heuristic: function vertex -> lower bound of the distance from
+                   vertex to target (must never overestimate)
+        stats: optional dict, receives the number of settled vertices
+               under the "settled" key
+    Returns:
+        (distance, path): path is the list of vertices from source to
+        target, or (inf, []) if target is unreachable
+    Raises:
+        KeyError:   if source or target node is not in the graph
+        ValueError: if graph is empty or contains negative weights
+    """
+    if not graph:
+        raise ValueError("Graph cannot be empty")
+    for node in (source, target):
+        if node not in graph:
+            raise KeyError(f"Node '{node}' not found in graph")
+
+    distances = {source: 0}
+    previous = {source: None}
+    # Min-heap (distance + heuristic, distance, vertex)
+    heap = [(heuristic(source), 0, source)]
+    settled = 0
+
+    while heap:
+        _, current_dist, vertex = heapq.heappop(heap)
+        if current_dist > distances[vertex]:
+            continue
+        settled += 1
+        if vertex == target:
+            if stats is not None:
+                stats["settled"] = settled
+            return current_dist, _build_path(previous, target)
+
+        for neighbor, weight in graph[vertex]:
+            if neighbor not in graph:
+                continue
+            if weight < 0:
+                raise ValueError(
+                    f"Negative weight detected: {weight} "
+                    f"on edge ({vertex}, {neighbor})"
+                )
+            new_dist = current_dist + weight
+            if new_dist < distances.get(neighbor, float('inf')):
+                distances[neighbor] = new_dist
+                previous[neighbor] = vertex
+                heapq.heappush(
+                    heap, (new_dist + heuristic(neighbor), new_dist, neighbor)
+                )
+
+    if stats is not None:
+        stats["settled"] = settled
+    return float('inf'), []
+
+
+def reverse_graph(graph) -> dict:
+    """
+    Builds the reverse adjacency list: every edge (u, v, w) becomes
+    (v, u, w). Edges to neighbors that are not in the graph are dropped.
+    """
+    reverse = {v: [] for v in graph}
+    for vertex, edges in graph.items():
+        for neighbor, weight in edges:
+            if neighbor in reverse:
+                reverse[neighbor].append((vertex, weight))
+    return reverse
+
+
+def _adjacency_snapshot(graph):
+    """
+    Fingerprint of a mutable adjacency list: every vertex with its edge
+    list object and length. PreparedGraph is immutable and needs none.
+    """
+    if isinstance(graph, PreparedGraph):
+        return None
+    return [(vertex, edges, len(edges)) for vertex, edges in graph.items()]
+
+
+def _snapshot_matches(graph, snapshot) -> bool:
+    """Check that vertices and edge lists of graph are as in snapshot."""
+    if snapshot is None:
+        return True
+    return len(graph) == len(snapshot) and all(
+        vertex == old_vertex and edges is old_edges and len(edges) == size
+        for (vertex, edges), (old_vertex, old_edges, size)
+        in zip(graph.items(), snapshot)
+    )
+
+
+def _cached_reverse_graph(graph) -> dict:
+    """
+    Return the reverse of graph, building it once per graph object.
+    Added or removed vertices and edges, or replaced edge lists, make
+    the cached reverse graph stale and it is rebuilt.
+    """
+    key = id(graph)
+    entry = _REVERSE_CACHE.get(key)
+    # The graph itself is kept in the entry, so its id can't be reused
+    if (entry is None or entry[0] is not graph
+            or not _snapshot_matches(graph, entry[1])):
+        entry = (graph, _adjacency_snapshot(graph), reverse_graph(graph))
+        _REVERSE_CACHE[key] = entry
+        if len(_REVERSE_CACHE) > REVERSE_CACHE_SIZE:
+            _REVERSE_CACHE.popitem(last=False)
+    _REVERSE_CACHE.move_to_end(key)
+    return entry[2]
+
+
+def _forget_reverse_graph(graph) -> None:
+    """Drop the cached reverse graph of graph, if any."""
+    _REVERSE_CACHE.pop(id(graph), None)
+
+
+def clear_reverse_cache() -> None:
+    """
+    Forget cached reverse graphs. Needed only after changing an edge in
+    place (same list, same length), which the cache can't detect.
+    """
+    _REVERSE_CACHE.clear()
+
+
+def bidirectional_dijkstra(graph, source, target,
+                           stats: dict | None = None) -> tuple[float, list]:
+    """
+    Bidirectional Dijkstra's algorithm for a single pair of vertices.
+    Alternates a forward search from source and a reverse search from
+    target over the reverse graph, which is built once and cached per
+    graph object (see clear_reverse_cache). Stops when the sum of both
+    frontier minimums reaches the best path found so far.
+    Args:
+        graph: adjacency list {node: [(neighbor, weight), ...]}
+        source: starting vertex
+        target: destination vertex
+        stats: optional dict, receives the number of settled vertices
+               under the "settled" key
+    Returns:
+        (distance, path): path is the list of vertices from source to
+        target, or (inf, []) if target is unreachable
+    Raises:
+        KeyError:   if source or target node is not in the graph
+        ValueError: if graph is empty or contains negative weights
+    """
+    if not graph:
+        raise ValueError("Graph cannot be empty")
+    for node in (source, target):
+        if node not in graph:
+            raise KeyError(f"Node '{node}' not found in graph")
+    if source == target:
+        if stats is not None:
+            stats["settled"] = 1
+        return 0, [source]
+
+    # Index 0 is the forward search, index 1 the reverse one
+    adjacency = (graph, _cached_reverse_graph(graph))
+    distances = ({source: 0}, {target: 0})
+    previous = ({source: None}, {target: None})
+    heaps = ([(0, source)], [(0, target)])
+    best = float('inf')
+    meeting = None
+    settled = 0
+    side = 1
+
+    while heaps[0] and heaps[1]:
+        if heaps[0][0][0] + heaps[1][0][0] >= best:
+            break
+        side = 1 - side
+        current_dist, vertex = heapq.heappop(heaps[side])
+        if current_dist > distances[side][vertex]:
+            continue
+        settled += 1
+        other = distances[1 - side]
+
+        for neighbor, weight in adjacency[side][vertex]:
+            if neighbor not in graph:
+                continue
+            if weight < 0:
+                edge = (vertex, neighbor) if side == 0 else (neighbor, vertex)
+                raise ValueError(
+                    f"Negative weight detected: {weight} on edge {edge}"
+                )
+            new_dist = current_dist + weight
+            if new_dist < distances[side].get(neighbor, float('inf')):
+                distances[side][neighbor] = new_dist
+                previous[side][neighbor] = vertex
+                heapq.heappush(heaps[side], (new_dist, neighbor))
+            if neighbor in other and new_dist + other[neighbor] < best:
+                best = new_dist + other[neighbor]
+                meeting = ((vertex, neighbor) if side == 0
+                           else (neighbor, vertex))
+
+    if stats is not None:
+        stats["settled"] = settled
+    if meeting is None:
+        return float('inf'), []
+
+    # The best path goes through the edge meeting[0] -> meeting[1]
+    path = _build_path(previous[0], meeting[0])
+    vertex = meeting[1]
+    while vertex is not None:
+        path.append(vertex)
+        vertex = previous[1][vertex]
+    return best, path
+
+
+def _build_path(previous: dict, target) -> list:
+    """Restore the path to target from the predecessor map."""
+    path = []
+    vertex = target
+    while vertex is not None:
+        path.append(vertex)
+        vertex = previous[vertex]
+    path.reverse()
+    return path
+
+
+class ShortestPathIndex:
+    """
+    Memoizes single-source Dijkstra results for a graph that rarely
+    changes. Results live in a size-bounded LRU cache. Edge changes must
+    go through add_edge/remove_edge/update_edge (or be followed by
+    cache_clear) so that cached distances stay correct: a shorter edge
+    is repaired incrementally, and a longer or removed edge evicts only
+    the results that used it.
+    """
+    def __init__(self, graph, maxsize: int = 128):
+        """
+        Args:
+            graph: adjacency list {node: [(neighbor, weight), ...]}
+            maxsize: maximum number of cached starting vertices
+        """
+        self.graph = graph
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._cache = OrderedDict()
+
+    def distances(self, start) -> dict:
+        """
+        Shortest distances from start, same as dijkstra_heap.
+        Raises:
+            KeyError:   if start node is not in the graph
+            ValueError: if graph is empty or contains negative weights
+        """
+        distances = self._cache.get(start)
+        if distances is not None:
+            self.hits += 1
+            self._cache.move_to_end(start)
+            return dict(distances)
+
+        self.misses += 1
+        distances = dijkstra_heap(self.graph, start)
+        self._cache[start] = distances
+        if len(self._cache) > self.maxsize:
+            self._cache.popitem(last=False)
+        return dict(distances)
+
+    def cache_info(self) -> CacheInfo:
+        """Hit and miss counters and the cache size."""
+        return CacheInfo(self.hits, self.misses, self.maxsize,
+                         len(self._cache))
+
+    def cache_clear(self) -> None:
+        """Drop all cached results and reset the counters."""
+        self._cache.clear()
+        self.hits = self.misses = 0
+
+    def add_edge(self, vertex, neighbor, weight) -> None:
+        """
+        Add edge vertex -> neighbor, creating missing vertices.
+        Raises:
+            ValueError: if weight is negative
+        """
+        if weight < 0:
+            raise ValueError(
+                f"Negative weight detected: {weight} "
+                f"on edge ({vertex}, {neighbor})"
+            )
+        for node in (vertex, neighbor):
+            if node not in self.graph:
+                self.graph[node] = []
+                for distances in self._cache.values():
+                    distances[node] = float('inf')
+        self.graph[vertex].append((neighbor, weight))
+        _forget_reverse_graph(self.graph)
+        self._edge_shortened(vertex, neighbor, weight)
+
+    def remove_edge(self, vertex, neighbor) -> None:
+        """
+        Remove all edges vertex -> neighbor.
+        Raises:
+            KeyError: if there is no such edge
+        """
+        old_weight = self._edge_weight(vertex, neighbor)
+        self.graph[vertex] = [
+            edge for edge in self.graph[vertex] if edge[0] != neighbor
+        ]
+        _forget_reverse_graph(self.graph)
+        self._edge_lengthened(vertex, neighbor, old_weight)
+
+    def update_edge(self, vertex, neighbor, weight) -> None:
+        """
+        Set the weight of all edges vertex -> neighbor.
+        Raises:
+            KeyError:   if there is no such edge
+            ValueError: if weight is negative
+        """
+        if weight < 0:
+            raise ValueError(
+                f"Negative weight detected: {weight} "
+                f"on edge ({vertex}, {neighbor})"
+            )
+        old_weight = self._edge_weight(vertex, neighbor)
+        self.graph[vertex] = [
+            (node, weight if node == neighbor else edge_weight)
+            for node, edge_weight in self.graph[vertex]
+        ]
+        _forget_reverse_graph(self.graph)
+        if weight < old_weight:
+            self._edge_shortened(vertex, neighbor, weight)
+        elif weight > old_weight:
+            self._edge_lengthened(vertex, neighbor, old_weight)
+
+    def _edge_weight(self, vertex, neighbor):
+        """Smallest weight among edges vertex -> neighbor."""
+        weights = [weight for node, weight in self.graph.get(vertex, ())
+                   if node == neighbor]
+        if not weights:
+            raise KeyError(f"Edge ({vertex}, {neighbor}) not found in graph")
+        return min(weights)
+
+    def _edge_shortened(self, vertex, neighbor, weight) -> None:
+        """Repair cached results after an edge got shorter or was added."""
+        for start in list(self._cache):
+            distances = self._cache[start]
+            new_dist = distances[vertex] + weight
+            if new_dist < distances[neighbor]:
+                distances[neighbor] = new_dist
+                if not self._repair(distances, neighbor):
+                    del self._cache[start]
+
+    def _edge_lengthened(self, vertex, neighbor, old_weight) -> None:
+        """Evict cached results whose shortest paths used the edge."""
+        for start in list(self._cache):
+            distances = self._cache[start]
+            if distances[vertex] + old_weight == distances[neighbor]:
+                del self._cache[start]
+
+    def _repair(self, distances: dict, vertex) -> bool:
+        """
+        Propagate a decreased distance of vertex through the graph.
+        Returns False if a negative edge became reachable.
+        """
+        heap = [(distances[vertex], vertex)]
+        while heap:
+            current_dist, vertex = heapq.heappop(heap)
+            if current_dist > distances[vertex]:
+                continue
+            for neighbor, weight in self.graph[vertex]:
+                if neighbor not in distances:
+                    continue
+                if weight < 0:
+                    return False
+                new_dist = current_dist + weight
+                if new_dist < distances[neighbor]:
+                    distances[neighbor] = new_dist
+                    heapq.heappush(heap, (new_dist, neighbor))
+        return True
+
+
+class CSRGraph:
+    """
+    Directed weighted graph in compressed sparse row form.
+    Node labels are mapped to integers 0..n-1. Edges of node i are
+    targets[offsets[i]:offsets[i + 1]] with the matching weights, all
+    stored in contiguous NumPy arrays.
+    """
+    def __init__(self, labels, sources, targets, weights):
+        """
+        Args:
+            labels: node labels, position in the list is the node index
+            sources: source index of every edge
+            targets: target index of every edge
+            weights: weight of every edge
+        """
+        self.labels = list(labels)
+        self.index = {label: i for i, label in enumerate(self.labels)}
+        sources = np.asarray(sources, dtype=np.int64)
+        order = np.argsort(sources, kind="stable")
+        self.targets = np.asarray(targets, dtype=np.int64)[order]
+        self.weights = np.asarray(weights)[order]
+        self.offsets = np.zeros(len(self.labels) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(sources, minlength=len(self.labels)),
+                  out=self.offsets[1:])
+        # Nodes with a negative outgoing edge, to fail like dijkstra_heap
+        self.negative = set(sources[order][self.weights < 0].tolist())
+
+    @classmethod
+    def from_adjacency(cls, graph) -> "CSRGraph":
+        """
+        Builds CSR graph from adjacency list {node: [(neighbor, weight)]}.
+        Edges to neighbors that are not keys of graph are dropped, the
+        same way dijkstra_heap skips them.
+        """
+        labels = list(graph)
+        index = {label: i for i, label in enumerate(labels)}
+        edge_lists = [graph[label] for label in labels]
+        # Edges come grouped by source, so sources is one np.repeat
+        sources = np.repeat(np.arange(len(labels)), np.fromiter(
+            map(len, edge_lists), dtype=np.int64, count=len(labels)))
+        edges = list(chain.from_iterable(edge_lists))
+        targets = np.fromiter(
+            map(index.get, [neighbor for neighbor, _ in edges], repeat(-1)),
+            dtype=np.int64, count=len(edges)
+        )
+        kept = targets >= 0
+        if not kept.all():
+            sources, targets = sources[kept], targets[kept]
+            edges = list(compress(edges, kept))
+        weights = np.array([weight for _, weight in edges])
+        return cls(labels, sources, targets, weights)
+
+    @classmethod
+    def from_edges(cls, edges, nodes=None) -> "CSRGraph":
+        """
+        Builds CSR graph from directed edges.
+        Args:
+            edges: iterable of (source, target, weight)
+            nodes: optional node labels, also used for isolated nodes;
+                   other labels are added in order of appearance
+        """
+        index = {}
+        for label in nodes or ():
+            index.setdefault(label, len(index))
+        sources, targets, weights = [], [], []
+        for source, target, weight in edges:
+            sources.append(index.setdefault(source, len(index)))
+            targets.append(index.setdefault(target, len(index)))
+            weights.append(weight)
+        return cls(index, sources, targets, weights)
+
+    def __len__(self):
+        return len(self.labels)
+
+    @property
+    def num_edges(self) -> int:
+        """Number of edges in the graph."""
+        return len(self.targets)
+
+
+class _NegativeEdge(Exception):
+    """Raised by _dijkstra_csr with the index of a negative edge."""
+
+
+def _negative_edge_error(graph: CSRGraph, error: _NegativeEdge):
+    """ValueError naming the negative edge of error by its labels."""
+    edge = error.args[0]
+    source = int(np.searchsorted(graph.offsets, edge, side="right")) - 1
+    return ValueError(
+        f"Negative weight detected: {graph.weights[edge].item()} "
+        f"on edge ({graph.labels[source]}, "
+        f"{graph.labels[graph.targets[edge]]})"
+    )
+
+
+def _dijkstra_csr(offsets, targets, weights, negative, start):
+    """
+    Dijkstra's algorithm over CSR arrays with integer-indexed distances.
+    Edges are read through memoryviews without copying, so the arrays
+    may live in shared memory. With integer weights heap entries are
+    single ints dist * n + vertex, which order like (dist, vertex)
+    tuples but are cheaper to create and compare.
+    Returns:
+        list of distances indexed by node
+    Raises:
+        _NegativeEdge: if a negative edge is reachable
+    """
+    num_nodes = len(offsets) - 1
+    integer = weights.dtype.kind in "iu"
+    offsets = offsets.tolist()
+    targets = memoryview(targets)
+    edge_weights = memoryview(weights)
+    distances = [float('inf')] * num_nodes
+    distances[start] = 0
+    heap = [start if integer else (0, start)]
+    heappush, heappop = heapq.heappush, heapq.heappop
+
+    while heap:
+        if integer:
+            current_dist, vertex = divmod(heappop(heap), num_nodes)
+        else:
+            current_dist, vertex = heappop(heap)
+        if current_dist > distances[vertex]:
+            continue
+        begin, end = offsets[vertex], offsets[vertex + 1]
+        if vertex in negative:
+            raise _NegativeEdge(begin + int(np.argmax(weights[begin:end] < 0)))
+        for neighbor, weight in zip(targets[begin:end],
+                                    edge_weights[begin:end]):
+            new_dist = current_dist + weight
+            if new_dist < distances[neighbor]:
+                distances[neighbor] = new_dist
+                heappush(heap, new_dist * num_nodes + neighbor if integer
+                         else (new_dist, neighbor))
+
+    return distances
+
+
+def dijkstra_csr(graph: CSRGraph, start, as_array: bool = False):
+    """
+    Dijkstra's algorithm with heap over a CSR graph.
+    Gives the same distances as dijkstra_heap on the same graph.
+    Args:
+        graph: CSRGraph instance
+        start: starting vertex label
+        as_array: return a NumPy array indexed like graph.labels
+    Returns:
+        distances: dictionary of distances to all vertices (or array)
+    Raises:
+        KeyError:   if start node is not in the graph
+        ValueError: if graph is empty or contains negative weights
+    """
+    if not len(graph):
+        raise ValueError("Graph cannot be empty")
+    if start not in graph.index:
+        raise KeyError(f"Start node '{start}' not found in graph")
+
+    try:
+        distances = _dijkstra_csr(graph.offsets, graph.targets, graph.weights,
+                                  graph.negative, graph.index[start])
+    except _NegativeEdge as error:
+        raise _negative_edge_error(graph, error) from None
+    if as_array:
+        return np.array(distances, dtype=float)
+    return dict(zip(graph.labels, distances))
+
+
+def _share_array(array: np.ndarray, blocks: list) -> tuple:
+    """Copy array into a new shared memory block and describe it."""
+    block = SharedMemory(create=True, size=max(array.nbytes, 1))
+    blocks.append(block)
+    np.ndarray(array.shape, array.dtype, buffer=block.buf)[...] = array
+    return block.name, array.shape, array.dtype.str
+
+
+def _attach_array(spec: tuple) -> tuple[SharedMemory, np.ndarray]:
+    """Attach to a shared array described by _share_array."""
+    name, shape, dtype = spec
+    block = SharedMemory(name=name)
+    return block, np.ndarray(shape, dtype, buffer=block.buf)
+
+
+def _init_worker(specs, negative):
+    """Attach the worker to the shared CSR graph once."""
+    blocks = []
+    for name, spec in zip(("offsets", "targets", "weights"), specs):
+        block, _WORKER_GRAPH[name] = _attach_array(spec)
+        blocks.append(block)
+    _WORKER_GRAPH["negative"] = negative
+    _WORKER_GRAPH["blocks"] = blocks
+
+
+def _worker_distances(task: tuple[int, int]):
+    """Run one search in a worker and return the row."""
+    row, start = task
+    distances = _dijkstra_csr(
+        _WORKER_GRAPH["offsets"], _WORKER_GRAPH["targets"],
+        _WORKER_GRAPH["weights"], _WORKER_GRAPH["negative"], start
+    )
+    return row, np.array(distances, dtype=float)
+
+
+def multi_source_distances(graph, sources, workers: int | None = None,
+                           stream: bool = False):
+    """
+    Dijkstra's algorithm from many sources in parallel processes.
+    The graph is converted to CSR form and placed in shared memory once,
+    so workers search over it in place instead of receiving a pickled
+    copy. Rows are filled into the result matrix as workers return them.
+    Args:
+        graph: adjacency list {node: [(neighbor, weight), ...]}
+               or CSRGraph
+        sources: starting vertices
+        workers: number of processes, os.cpu_count() by default;
+                 1 runs everything in the current process
+        stream: yield (source, row) pairs in source order instead of
+                returning the whole matrix
+    Returns:
+        array of shape (len(sources), number of nodes), columns ordered
+        like CSRGraph.labels (or a generator of rows if stream is set)
+    Raises:
+        KeyError:   if a source node is not in the graph
+        ValueError: if graph is empty or contains negative weights
+    """
+    csr = (graph if isinstance(graph, CSRGraph)
+           else CSRGraph.from_adjacency(graph))
+    if not len(csr):
+        raise ValueError("Graph cannot be empty")
+    sources = list(sources)
+    for source in sources:
+        if source not in csr.index:
+            raise KeyError(f"Start node '{source}' not found in graph")
+    tasks = [(row, csr.index[source]) for row, source in enumerate(sources)]
+    workers = workers or os.cpu_count() or 1
+    rows = _multi_source_rows(csr, sources, tasks, workers, stream)
+    if stream:
+        return rows
+    matrix = None
+    for matrix in rows:
+        pass
+    return matrix
+
+
+def _multi_source_rows(csr, sources, tasks, workers, stream):
+    """Generator behind multi_source_distances."""
+    matrix = None if stream else np.empty((len(tasks), len(csr)))
+    try:
+        for row, distances in _search_rows(csr, tasks, workers):
+            if stream:
+                yield sources[row], distances
+            else:
+                matrix[row] = distances
+    except _NegativeEdge as error:
+        raise _negative_edge_error(csr, error) from None
+    if not stream:
+        yield matrix
+
+
+def _search_rows(csr, tasks, workers):
+    """Yield (row, distances) of every task, in order of tasks."""
+    arrays = (csr.offsets, csr.targets, csr.weights)
+    if workers == 1:
+        for row, start in tasks:
+            distances = _dijkstra_csr(*arrays, csr.negative, start)
+            yield row, np.array(distances, dtype=float)
+        return
+
+    blocks = []
+    try:
+        specs = [_share_array(array, blocks) for array in arrays]
+        with Pool(workers, _init_worker, (specs, csr.negative)) as pool:
+            chunksize = max(1, len(tasks) // (workers * 4))
+            yield from pool.imap(_worker_distances, tasks, chunksize)
+    finally:
+        for block in blocks:
+            block.close()
+            block.unlink()
+
+
+def benchmark_multi_source(num_nodes: int = 50_000,
+                           num_edges: int = 200_000,
+                           num_sources: int = 64) -> None:
+    """
+    Measures multi_source_distances throughput for growing worker counts.
+    Args:
+        num_nodes: number of nodes
+        num_edges: number of edges
+        num_sources: number of source vertices
+    Returns:
+        None
+    """
+    csr = CSRGraph.from_adjacency(random_graph(num_nodes, num_edges))
+    sources = list(range(num_sources))
+    baseline = None
+    workers = 1
+    while workers <= (os.cpu_count() or 1):
+        start = time.perf_counter()
+        multi_source_distances(csr, sources, workers=workers)
+        elapsed = time.perf_counter() - start
+        baseline = baseline or elapsed
+        print(f"{workers:>3} workers: {elapsed:.2f} s, "
+              f"{num_sources / elapsed:.1f} sources/s, "
+              f"speedup {baseline / elapsed:.2f}x")
+        workers *= 2
+
+
+def random_graph(num_nodes: int, num_edges: int, max_weight: int = 100,
+                 seed: int = 0) -> dict:
+    """
+    Generates a random directed graph as adjacency list.
+    Args:
+        num_nodes: number of nodes, labelled 0..num_nodes-1
+        num_edges: number of edges
+        max_weight: largest edge weight
+        seed: random seed
+    Returns:
+        adjacency list {node: [(neighbor, weight), ...]}
+    """
+    rng = random.Random(seed)
+    graph = {v: [] for v in range(num_nodes)}
+    for _ in range(num_edges):
+        graph[rng.randrange(num_nodes)].append(
+            (rng.randrange(num_nodes), rng.randint(1, max_weight))
+        )
+    return graph
+
+
+def benchmark_csr(num_nodes: int = 250_000,
+                  num_edges: int = 1_000_000) -> None:
+    """
+    Compares dijkstra_heap and dijkstra_csr on a random graph.
+    Args:
+        num_nodes: number of nodes
+        num_edges: number of edges
+    Returns:
+        None
+    """
+    graph = random_graph(num_nodes, num_edges)
+
+    start = time.perf_counter()
+    expected = dijkstra_heap(graph, 0)
+    heap_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    csr = CSRGraph.from_adjacency(graph)
+    build_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    distances = dijkstra_csr(csr, 0)
+    csr_time = time.perf_counter() - start
+
+    print(f"{num_nodes} nodes, {num_edges} edges")
+    print(f"dijkstra_heap: {heap_time:.3f} s")
+    print(f"dijkstra_csr:  {csr_time:.3f} s "
+          f"(+{build_time:.3f} s one-time build), "
+          f"speedup {heap_time / csr_time:.2f}x")
+    print(f"Results match: {distances == expected}")
+
+    # from_edges must not rely on edges being grouped by source
+    edges = [(vertex, neighbor, weight) for vertex, neighbors in graph.items()
+             for neighbor, weight in neighbors]
+    random.Random(0).shuffle(edges)
+    csr = CSRGraph.from_edges(edges, nodes=list(graph))
+    print(f"Unsorted edges match: {dijkstra_csr(csr, 0) == expected}")
+
+    graph = {vertex: list(neighbors) for vertex, neighbors in graph.items()}
+    graph[0].append((1, -1))
+    edges.insert(len(edges) // 2, (0, 1, -1))
+    csr = CSRGraph.from_edges(edges, nodes=list(graph))
+    errors = []
+    for search, searched in ((dijkstra_heap, graph), (dijkstra_csr, csr)):
+        try:
+            search(searched, 0)
+        except ValueError as error:
+            errors.append(str(error))
+    detected = len(errors) == 2 and errors[0] == errors[1]
+    print(f"Negative edge detected: {detected}")
+
+
+def benchmark_queues(cases=((200_000, 800_000), (2_000, 1_000_000))) -> None:
+    """
+    Compares lazy-deletion and indexed heaps in dijkstra_heap on sparse
+    and dense random graphs.
+    Args:
+        cases: (num_nodes, num_edges) of every benchmarked graph
+    Returns:
+        None
+    """
+    for num_nodes, num_edges in cases:
+        graph = random_graph(num_nodes, num_edges)
+        results = []
+        print(f"{num_nodes} nodes, {num_edges} edges:")
+        for queue, arity in (("lazy", 2), ("indexed", 2), ("indexed", 4)):
+            start = time.perf_counter()
+            results.append(dijkstra_heap(graph, 0, queue, arity))
+            elapsed = time.perf_counter() - start
+            print(f"{queue:>10} arity {arity}: {elapsed:.3f} s")
+        print(f"Results match: {all(r == results[0] for r in results)}")
+
+
+def grid_graph(width: int, height: int, max_weight: int = 10,
+               seed: int = 0) -> dict:
+    """
+    Generates a road-network-like grid graph as adjacency list.
+    Nodes are (x, y) tuples connected to their 4 neighbours in both
+    directions with random weights.
+    """
+    rng = random.Random(seed)
+    graph = {(x, y): [] for x in range(width) for y in range(height)}
+    for x, y in graph:
+        for neighbor in ((x + 1, y), (x, y + 1)):
+            if neighbor in graph:
+                weight = rng.randint(1, max_weight)
+                graph[(x, y)].append((neighbor, weight))
+                graph[neighbor].append(((x, y), weight))
+    return graph
+
+
+def benchmark_bidirectional(side: int = 300, queries: int = 20) -> None:
+    """
+    Compares settled vertices and time of shortest_path and
+    bidirectional_dijkstra on far-apart pairs of a grid graph, and
+    checks both against dijkstra_heap.
+    Args:
+        side: width and height of the grid
+        queries: number of random source/target pairs
+    Returns:
+        None
+    """
+    graph = grid_graph(side, side)
+    rng = random.Random(1)
+    totals = {"one-way": [0, 0.0], "bidirectional": [0, 0.0]}
+    for _ in range(queries):
+        source = (rng.randrange(side // 4), rng.randrange(side))
+        target = (side - 1 - rng.randrange(side // 4), rng.randrange(side))
+        expected = dijkstra_heap(graph, source)[target]
+        for name, search in (("one-way", shortest_path),
+                             ("bidirectional", bidirectional_dijkstra)):
+            stats = {}
+            start = time.perf_counter()
+            distance, path = search(graph, source, target, stats)
+            totals[name][1] += time.perf_counter() - start
+            totals[name][0] += stats["settled"]
+            if (distance != expected or path[0] != source
+                    or path[-1] != target):
+                raise AssertionError(f"{name} mismatch for {source}->{target}")
+    print(f"{side}x{side} grid, {queries} queries, all results match")
+    for name, (settled, elapsed) in totals.items():
+        print(f"{name:>14}: {settled / queries:>10.0f} settled/query, "
+              f"{elapsed / queries * 1000:>8.1f} ms/query")
+
+
+def check_bidirectional(trials: int = 3000, seed: int = 0) -> None:
+    """
+    Compares bidirectional_dijkstra with dijkstra_heap on small random
+    directed graphs with zero weights, dangling edges, unreachable
+    targets and source == target.
+    Args:
+        trials: number of random graphs, one query each
+        seed: random seed
+    Returns:
+        None
+    Raises:
+        AssertionError: on the first mismatch
+    """
+    rng = random.Random(seed)
+    for trial in range(trials):
+        num_nodes = rng.randint(1, 8)
+        graph = {v: [] for v in range(num_nodes)}
+        for _ in range(rng.randint(0, 3 * num_nodes)):
+            # A neighbor past num_nodes makes a dangling edge
+            graph[rng.randrange(num_nodes)].append(
+                (rng.randrange(num_nodes + 1), rng.randint(0, 5))
+            )
+        source = rng.randrange(num_nodes)
+        target = rng.randrange(num_nodes)
+        expected = dijkstra_heap(graph, source)[target]
+        distance, path = bidirectional_dijkstra(graph, source, target)
+        edges_ok = bool(path) and path[0] == source and path[-1] == target
+        if edges_ok:
+            length = 0
+            for vertex, neighbor in zip(path, path[1:]):
+                weights = [w for n, w in graph[vertex] if n == neighbor]
+                edges_ok = edges_ok and bool(weights)
+                length += min(weights, default=0)
+            edges_ok = edges_ok and length == distance
+        if distance != expected or edges_ok != (expected != float('inf')):
+            raise AssertionError(
+                f"Trial {trial}: {source}->{target} in {graph} gave "
+                f"{(distance, path)}, expected distance {expected}"
+            )
+    print(f"{trials} random graphs, all results match")
+
+
 def usage_example(node: str) -> None:
     """
     Usage example for dijkstra_heap function.
@@ -1,12 +1,24 @@
-"""Module for visualizing heap data structures using NetworkX
-   and Matplotlib."""
+"""Module for visualizing heap data structures with Matplotlib
+   collections."""
 
-import uuid
+import itertools
 import heapq
+import operator
 import random
+import time
+from collections import deque, namedtuple
 from typing import List
-import networkx as nx
+import numpy as np
 import matplotlib.pyplot as plt
+from matplotlib.collections import LineCollection
+
+
+# Trees with more nodes are drawn without value labels
+LABEL_LIMIT = 127
+# Node positions, parent indices (-1 for the root), colours and labels
+TreeLayout = namedtuple("TreeLayout", ["x", "y", "parents", "colors",
+                                       "labels"])
+_node_ids = itertools.count()
 
 
 class Node:
@@ -16,38 +28,82 @@ class Node:
         self.right = None
         self.val = key
         self.color = color
-        self.id = str(uuid.uuid4())
+        self.id = next(_node_ids)
+
+
+def tree_layout(tree_root) -> TreeLayout:
+    """
+    Computes node positions of a linked binary tree iteratively.
+    A child is shifted by 1 / 2 ** layer to the left or right of its
+    parent, one row lower.
+    """
+    x, y, parents = [0.0], [0], [-1]
+    colors, labels = [tree_root.color], [tree_root.val]
+    queue = deque([(tree_root, 0)])
+    while queue:
+        node, index = queue.popleft()
+        shift = 0.5 ** (1 - y[index])
+        for child, direction in ((node.left, -1), (node.right, 1)):
+            if child is not None:
+                x.append(x[index] + direction * shift)
+                y.append(y[index] - 1)
+                parents.append(index)
+                colors.append(child.color)
+                labels.append(child.val)
+                queue.append((child, len(x) - 1))
+    return TreeLayout(np.array(x), np.array(y, dtype=float),
+                      np.array(parents), colors, labels)
 
 
-def add_edges(graph, node, pos, x=0, y=0, layer=1):
-    """Recursively add edges to the graph for visualization."""
-    if node is not None:
-        graph.add_node(node.id, color=node.color, label=node.val)
-        if node.left:
-            graph.add_edge(node.id, node.left.id)
-            l = x - 1 / 2 ** layer
-            pos[node.left.id] = (l, y - 1)
-            l = add_edges(graph, node.left, pos, x=l, y=y - 1, layer=layer + 1)
-        if node.right:
-            graph.add_edge(node.id, node.right.id)
-            r = x + 1 / 2 ** layer
-            pos[node.right.id] = (r, y - 1)
-            r = add_edges(graph, node.right, pos, x=r, y=y - 1, layer=layer + 1)
-    return graph
+def render_tree(layout: TreeLayout, out_path: str | None = None) -> None:
+    """
+    Draws a laid out tree with one collection call for all edges and
+    one for all nodes. Saves the picture to out_path if given, otherwise
+    shows it.
+    """
+    count = len(layout.x)
+    fig, ax = plt.subplots(figsize=(8, 5))
+    children = np.flatnonzero(layout.parents >= 0)
+    parents = layout.parents[children]
+    edges = np.stack((
+        np.column_stack((layout.x[parents], layout.y[parents])),
+        np.column_stack((layout.x[children], layout.y[children]))
+    ), axis=1)
+    ax.add_collection(LineCollection(edges, colors="black",
+                                     linewidths=1 if count <= LABEL_LIMIT
+                                     else 0.2, zorder=1))
+    # Keep the default look for small trees, shrink markers for large ones
+    node_size = 2500 if count <= 31 else max(2500 * 31 / count, 1)
+    ax.scatter(layout.x, layout.y, s=node_size, c=layout.colors, zorder=2)
+    if count <= LABEL_LIMIT:
+        for x, y, label in zip(layout.x, layout.y, layout.labels):
+            ax.text(x, y, str(label), ha="center", va="center", zorder=3)
+    ax.set_axis_off()
+    ax.margins(0.05)
+    if out_path:
+        fig.savefig(out_path)
+        plt.close(fig)
+    else:
+        plt.show()
 
 
-def draw_tree(tree_root: Node) -> None:
-    """Draws the binary tree using NetworkX and Matplotlib."""
-    tree = nx.DiGraph()
-    pos = {tree_root.id: (0, 0)}
-    tree = add_edges(tree, tree_root, pos)
+def draw_tree(tree_root: Node, out_path: str | None = None) -> None:
+    """Draws the binary tree using Matplotlib collections."""
+    render_tree(tree_layout(tree_root), out_path)
 
-    colors = [node[1]['color'] for node in tree.nodes(data=True)]
-    labels = {node[0]: node[1]['label'] for node in tree.nodes(data=True)}
 
-    plt.figure(figsize=(8, 5))
-    nx.draw(tree, pos=pos, labels=labels, arrows=False, node_size=2500, node_color=colors)
-    plt.show()
+def heap_layout(size: int) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Computes node positions of an array-indexed heap without building
+    a tree: the children of element i are 2i+1 and 2i+2.
+    Returns:
+        (x, y, parents) arrays, placed like tree_layout places them
+    """
+    index = np.arange(size)
+    level = np.floor(np.log2(index + 1)).astype(np.int64)
+    first = (1 << level) - 1
+    x = -1 + (2 * (index - first) + 1) / 2.0 ** level
+    return x, -level.astype(float), (index - 1) // 2
 
 
 def build_binary_tree(arr: List[int]) -> Node:
@@ -73,15 +129,277 @@ def build_binary_tree(arr: List[int]) -> Node:
     return nodes[0]
 
 
-def draw_heap(arr: List[int], max_heap: bool = False) -> None:
-    """Draw heap representation of the given array."""
+def _precedes(key=None, max_heap: bool = False):
+    """Return a strict 'is closer to the root' predicate."""
+    if key is None:
+        return operator.gt if max_heap else operator.lt
     if max_heap:
-        arr = [-x for x in arr]
-    heapq.heapify(arr)
-    if max_heap:
-        arr = [-x for x in arr]
-    root = build_binary_tree(arr)
-    draw_tree(root)
+        return lambda a, b: key(a) > key(b)
+    return lambda a, b: key(a) < key(b)
+
+
+def _sift_down(items: list, start: int, pos: int, before) -> None:
+    """Move items[pos] up towards start, as heapq._siftdown does."""
+    new_item = items[pos]
+    while pos > start:
+        parent_pos = (pos - 1) >> 1
+        parent = items[parent_pos]
+        if before(new_item, parent):
+            items[pos] = parent
+            pos = parent_pos
+            continue
+        break
+    items[pos] = new_item
+
+
+def _sift_up(items: list, pos: int, before) -> None:
+    """Move items[pos] down to a leaf and back up, as heapq._siftup does."""
+    end_pos = len(items)
+    start_pos = pos
+    new_item = items[pos]
+    child_pos = 2 * pos + 1
+    while child_pos < end_pos:
+        right_pos = child_pos + 1
+        if (right_pos < end_pos
+                and not before(items[child_pos], items[right_pos])):
+            child_pos = right_pos
+        items[pos] = items[child_pos]
+        pos = child_pos
+        child_pos = 2 * pos + 1
+    items[pos] = new_item
+    _sift_down(items, start_pos, pos, before)
+
+
+def _heapify(items: list, before) -> None:
+    """Transform list into a heap in place, in O(n) time."""
+    for i in reversed(range(len(items) // 2)):
+        _sift_up(items, i, before)
+
+
+class Heap:
+    """
+    Binary heap with min or max ordering and an optional key function.
+    Items are kept in heap order in a plain list (see items), so a heap
+    can be drawn with draw_heap_array(heap.items).
+    """
+    def __init__(self, iterable=(), key=None, max_heap: bool = False):
+        """
+        Args:
+            iterable: initial items, heapified in O(n)
+            key: function extracting a comparison key from each item
+            max_heap: put the largest item at the root
+        """
+        self.key = key
+        self.max_heap = max_heap
+        self._before = _precedes(key, max_heap)
+        # Plain min-heap of items: heapq does all the work in C
+        self._native = key is None and not max_heap
+        self._items = list(iterable)
+        self._heapify()
+
+    def __len__(self):
+        return len(self._items)
+
+    @property
+    def items(self) -> list:
+        """Items in heap order, the root first."""
+        return self._items
+
+    def _heapify(self) -> None:
+        """Restore the heap order of all items."""
+        if self._native:
+            heapq.heapify(self._items)
+        else:
+            _heapify(self._items, self._before)
+
+    def peek(self):
+        """Return the root item without removing it."""
+        if not self._items:
+            raise IndexError("peek from empty heap")
+        return self._items[0]
+
+    def push(self, item) -> None:
+        """Add an item to the heap."""
+        if self._native:
+            heapq.heappush(self._items, item)
+            return
+        self._items.append(item)
+        _sift_down(self._items, 0, len(self._items) - 1, self._before)
+
+    def pop(self):
+        """Remove and return the root item."""
+        if self._native:
+            return heapq.heappop(self._items)
+        last = self._items.pop()
+        if not self._items:
+            return last
+        root = self._items[0]
+        self._items[0] = last
+        _sift_up(self._items, 0, self._before)
+        return root
+
+    def pushpop(self, item):
+        """Push item, then pop and return the root: faster than both."""
+        if self._native:
+            return heapq.heappushpop(self._items, item)
+        if self._items and self._before(self._items[0], item):
+            item, self._items[0] = self._items[0], item
+            _sift_up(self._items, 0, self._before)
+        return item
+
+    def replace(self, item):
+        """Pop and return the root, then push item."""
+        if self._native:
+            return heapq.heapreplace(self._items, item)
+        if not self._items:
+            raise IndexError("replace on empty heap")
+        root = self._items[0]
+        self._items[0] = item
+        _sift_up(self._items, 0, self._before)
+        return root
+
+    def merge(self, *others) -> "Heap":
+        """
+        Add all items of other heaps or iterables in O(n + m) and
+        return self.
+        """
+        for other in others:
+            self._items.extend(other.items if isinstance(other, Heap)
+                               else other)
+        self._heapify()
+        return self
+
+
+def top_k(iterable, k: int, key=None, largest: bool = True) -> list:
+    """
+    Select the k largest (or smallest) items of a stream.
+    Keeps only k items in memory, so the input may be unbounded.
+    Returns the same list as heapq.nlargest / heapq.nsmallest.
+    Args:
+        iterable: any iterable of items
+        k: number of items to select
+        key: function extracting a comparison key from each item
+        largest: select largest items, otherwise smallest
+    Returns:
+        selected items, best first
+    """
+    if k <= 0:
+        return []
+    iterator = iter(iterable)
+    if key is None and largest:
+        # Min-heap of the best items so far, its root is the worst one
+        selected = list(itertools.islice(iterator, k))
+        heapq.heapify(selected)
+        for item in iterator:
+            if selected[0] < item:
+                heapq.heapreplace(selected, item)
+        selected.sort(reverse=True)
+        return selected
+
+    # (key, order, item) entries keep ties in input order
+    sign = -1 if largest else 1
+    keyed = ((item if key is None else key(item), sign * order, item)
+             for order, item in enumerate(iterator))
+    selected = Heap(itertools.islice(keyed, k), max_heap=not largest)
+    worst = selected.items
+    for entry in keyed:
+        if (entry > worst[0]) if largest else (entry < worst[0]):
+            selected.replace(entry)
+    return [entry[2] for entry in sorted(worst, reverse=largest)]
+
+
+def benchmark_top_k(size: int = 10_000_000, k: int = 100) -> None:
+    """
+    Compares top_k with heapq.nlargest and full sorting.
+    Args:
+        size: number of random input values
+        k: number of selected values
+    Returns:
+        None
+    """
+    values = [random.random() for _ in range(size)]
+    candidates = (
+        ("top_k", lambda: top_k(values, k)),
+        ("top_k, key", lambda: top_k(values, k, key=abs)),
+        ("heapq.nlargest", lambda: heapq.nlargest(k, values)),
+        ("sorted", lambda: sorted(values, reverse=True)[:k]),
+    )
+    expected = None
+    for name, select in candidates:
+        start = time.perf_counter()
+        result = select()
+        elapsed = time.perf_counter() - start
+        expected = expected or result
+        print(f"{name:>15}: {elapsed:.3f} s, "
+              f"same result: {result == expected}")
+
+
+def draw_heap_array(heap, levels: int | None = None,
+                    out_path: str | None = None,
+                    color: str = "skyblue") -> None:
+    """
+    Draws an array that already is a heap, straight from the array:
+    the children of element i are 2i+1 and 2i+2. No Node objects are
+    built and NumPy arrays are used as they are.
+    Args:
+        heap: list or NumPy array in heap order
+        levels: draw only this many top levels of the heap
+        out_path: save the picture to this file instead of showing it
+        color: node colour
+    """
+    count = len(heap)
+    if levels is not None:
+        count = min(count, 2 ** levels - 1)
+    if count == 0:
+        return
+    x, y, parents = heap_layout(count)
+    render_tree(TreeLayout(x, y, parents, color, heap[:count]), out_path)
+
+
+def draw_heap(arr: List[int], max_heap: bool = False, key=None,
+              levels: int | None = None,
+              out_path: str | None = None) -> None:
+    """
+    Draw heap representation of the given array.
+    The input is not modified. Lists are heapified like heapq.heapify
+    does, with max_heap and key changing the order instead of negating
+    values. One-dimensional NumPy arrays without key are laid out in
+    sorted order instead, which is a valid heap but usually not the one
+    heapify gives for the same values: only the drawn top levels are
+    selected with np.partition and sorted. Use draw_heap_array for
+    arrays that already are heaps.
+    Args:
+        arr: values (list or one-dimensional NumPy array)
+        max_heap: put the largest value at the root
+        key: function extracting a comparison key from each value
+        levels: draw only this many top levels of the heap
+        out_path: save the picture to this file instead of showing it
+    Raises:
+        ValueError: if arr is a NumPy array with more than one dimension
+    """
+    if isinstance(arr, np.ndarray) and arr.ndim != 1:
+        raise ValueError(f"Expected a 1-D array, got {arr.ndim} dimensions")
+    if isinstance(arr, np.ndarray) and key is None:
+        count = len(arr)
+        if levels is not None:
+            count = min(count, 2 ** levels - 1)
+        if 0 < count < len(arr):
+            # Smallest (or largest) count values, in any order
+            kth = len(arr) - count if max_heap else count - 1
+            heap = np.partition(arr, kth)
+            heap = heap[kth:] if max_heap else heap[:count]
+        else:
+            heap = arr[:count].copy()
+        heap.sort()
+        if max_heap:
+            heap = heap[::-1]
+    else:
+        heap = list(arr)
+        if key is None and not max_heap:
+            heapq.heapify(heap)
+        else:
+            _heapify(heap, _precedes(key, max_heap))
+    draw_heap_array(heap, levels, out_path)
 
 
 if __name__ == "__main__":
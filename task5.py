@@ -1,10 +1,19 @@
 """Binary Tree with DFS and BFS Traversals and Visualization."""
 
-import uuid
+import itertools
 import random
-from collections import deque
-import networkx as nx
+from collections import deque, namedtuple
+import numpy as np
 import matplotlib.pyplot as plt
+from matplotlib.collections import LineCollection
+
+
+# Trees with more nodes are drawn without value labels
+LABEL_LIMIT = 127
+# Node positions, parent indices (-1 for the root), colours and labels
+TreeLayout = namedtuple("TreeLayout", ["x", "y", "parents", "colors",
+                                       "labels"])
+_node_ids = itertools.count()
 
 
 class Node:
@@ -14,54 +23,273 @@ class Node:
         self.right = None
         self.val = key
         self.color = color
-        self.id = str(uuid.uuid4())
-
-
-def add_edges(graph, node, pos, x=0, y=0, layer=1):
-    """Recursively add edges to the graph for visualization."""
-    if node is not None:
-        graph.add_node(node.id, color=node.color, label=node.val)
-    if node.left:
-        graph.add_edge(node.id, node.left.id)
-        left_x = x - 1 / 2 ** layer
-        pos[node.left.id] = (left_x, y - 1)
-        add_edges(graph, node.left, pos, x=left_x, y=y - 1, layer=layer + 1)
-    if node.right:
-        graph.add_edge(node.id, node.right.id)
-        right_x = x + 1 / 2 ** layer
-        pos[node.right.id] = (right_x, y - 1)
-        add_edges(graph, node.right, pos, x=right_x, y=y - 1, layer=layer + 1)
-    return graph
-
-
-def draw_tree(tree_root):
-    """Draws the binary tree using NetworkX and Matplotlib."""
-    tree = nx.DiGraph()
-    pos = {tree_root.id: (0, 0)}
-    tree = add_edges(tree, tree_root, pos)
-
-    colors = [node[1]['color'] for node in tree.nodes(data=True)]
-    labels = {node[0]: node[1]['label'] for node in tree.nodes(data=True)}
-
-    plt.figure(figsize=(8, 5))
-    nx.draw(
-        tree, pos=pos, labels=labels, arrows=False,
-        node_size=2500, node_color=colors
-    )
-    plt.show()
+        self.id = next(_node_ids)
+        # Height of the subtree, maintained by AVLTree
+        self.height = 1
+
+
+def tree_layout(tree_root) -> TreeLayout:
+    """
+    Computes node positions of a linked binary tree iteratively.
+    A child is shifted by 1 / 2 ** layer to the left or right of its
+    parent, one row lower.
+    """
+    x, y, parents = [0.0], [0], [-1]
+    colors, labels = [tree_root.color], [tree_root.val]
+    queue = deque([(tree_root, 0)])
+    while queue:
+        node, index = queue.popleft()
+        shift = 0.5 ** (1 - y[index])
+        for child, direction in ((node.left, -1), (node.right, 1)):
+            if child is not None:
+                x.append(x[index] + direction * shift)
+                y.append(y[index] - 1)
+                parents.append(index)
+                colors.append(child.color)
+                labels.append(child.val)
+                queue.append((child, len(x) - 1))
+    return TreeLayout(np.array(x), np.array(y, dtype=float),
+                      np.array(parents), colors, labels)
+
+
+def render_tree(layout: TreeLayout, out_path: str | None = None) -> None:
+    """
+    Draws a laid out tree with one collection call for all edges and
+    one for all nodes. Saves the picture to out_path if given, otherwise
+    shows it.
+    """
+    count = len(layout.x)
+    fig, ax = plt.subplots(figsize=(8, 5))
+    children = np.flatnonzero(layout.parents >= 0)
+    parents = layout.parents[children]
+    edges = np.stack((
+        np.column_stack((layout.x[parents], layout.y[parents])),
+        np.column_stack((layout.x[children], layout.y[children]))
+    ), axis=1)
+    ax.add_collection(LineCollection(edges, colors="black",
+                                     linewidths=1 if count <= LABEL_LIMIT
+                                     else 0.2, zorder=1))
+    # Keep the default look for small trees, shrink markers for large ones
+    node_size = 2500 if count <= 31 else max(2500 * 31 / count, 1)
+    ax.scatter(layout.x, layout.y, s=node_size, c=layout.colors, zorder=2)
+    if count <= LABEL_LIMIT:
+        for x, y, label in zip(layout.x, layout.y, layout.labels):
+            ax.text(x, y, str(label), ha="center", va="center", zorder=3)
+    ax.set_axis_off()
+    ax.margins(0.05)
+    if out_path:
+        fig.savefig(out_path)
+        plt.close(fig)
+    else:
+        plt.show()
+
+
+def draw_tree(tree_root, out_path=None):
+    """Draws the binary tree using Matplotlib collections."""
+    render_tree(tree_layout(tree_root), out_path)
 
 
 def insert(root: Node, key) -> Node:
     """Insert key into the binary search tree rooted at root."""
+    new_node = Node(key)
     if root is None:
-        return Node(key)
-
-    if key < root.val:
-        root.left = insert(root.left, key)
-    else:
-        root.right = insert(root.right, key)
-
-    return root
+        return new_node
+
+    node = root
+    while True:
+        if key < node.val:
+            if node.left is None:
+                node.left = new_node
+                return root
+            node = node.left
+        else:
+            if node.right is None:
+                node.right = new_node
+                return root
+            node = node.right
+
+
+def _height(node: Node | None) -> int:
+    """Height of a subtree, 0 for an empty one."""
+    return node.height if node else 0
+
+
+def _update_height(node: Node) -> None:
+    """Recompute node height from its children."""
+    node.height = 1 + max(_height(node.left), _height(node.right))
+
+
+def _rotate_right(node: Node) -> Node:
+    """Rotate subtree right and return its new root."""
+    pivot = node.left
+    node.left = pivot.right
+    pivot.right = node
+    _update_height(node)
+    _update_height(pivot)
+    return pivot
+
+
+def _rotate_left(node: Node) -> Node:
+    """Rotate subtree left and return its new root."""
+    pivot = node.right
+    node.right = pivot.left
+    pivot.left = node
+    _update_height(node)
+    _update_height(pivot)
+    return pivot
+
+
+def _rebalance(node: Node) -> Node:
+    """Restore the AVL balance of node and return the subtree root."""
+    _update_height(node)
+    balance = _height(node.left) - _height(node.right)
+    if balance > 1:
+        if _height(node.left.left) < _height(node.left.right):
+            node.left = _rotate_left(node.left)
+        return _rotate_right(node)
+    if balance < -1:
+        if _height(node.right.right) < _height(node.right.left):
+            node.right = _rotate_right(node.right)
+        return _rotate_left(node)
+    return node
+
+
+class AVLTree:
+    """
+    Self-balancing binary search tree (AVL) with iterative operations.
+    Keys equal to a node may end up on either side of it after
+    rotations: left <= node <= right. The root is a regular Node, so
+    traversals and draw_tree work on tree.root.
+    """
+    def __init__(self, keys=()):
+        self.root = None
+        self.size = 0
+        for key in keys:
+            self.insert(key)
+
+    def __len__(self):
+        return self.size
+
+    def __contains__(self, key):
+        return self.search(key) is not None
+
+    @classmethod
+    def build_from_sorted(cls, keys) -> "AVLTree":
+        """
+        Builds a perfectly balanced tree from sorted keys in O(n).
+        Raises:
+            ValueError: if keys are not sorted
+        """
+        keys = list(keys)
+        if any(keys[i + 1] < keys[i] for i in range(len(keys) - 1)):
+            raise ValueError("Keys must be sorted")
+        tree = cls()
+        tree.size = len(keys)
+        if not keys:
+            return tree
+
+        # (first, end, parent, is_left_child) ranges still to be built
+        stack = [(0, len(keys), None, False)]
+        while stack:
+            first, end, parent, is_left = stack.pop()
+            middle = (first + end) // 2
+            node = Node(keys[middle])
+            # A range of m keys split in the middle has height len(bin(m))
+            node.height = (end - first).bit_length()
+            if parent is None:
+                tree.root = node
+            elif is_left:
+                parent.left = node
+            else:
+                parent.right = node
+            if first < middle:
+                stack.append((first, middle, node, True))
+            if middle + 1 < end:
+                stack.append((middle + 1, end, node, False))
+        return tree
+
+    def search(self, key) -> Node | None:
+        """Return a node holding key or None."""
+        node = self.root
+        while node:
+            if key < node.val:
+                node = node.left
+            elif node.val < key:
+                node = node.right
+            else:
+                return node
+        return None
+
+    def insert(self, key) -> None:
+        """Insert key and rebalance the tree."""
+        path = []
+        node = self.root
+        while node:
+            path.append(node)
+            node = node.left if key < node.val else node.right
+
+        new_node = Node(key)
+        if not path:
+            self.root = new_node
+        elif key < path[-1].val:
+            path[-1].left = new_node
+        else:
+            path[-1].right = new_node
+        self.size += 1
+        self._retrace(path)
+
+    def delete(self, key) -> bool:
+        """
+        Delete one occurrence of key and rebalance the tree.
+        Returns:
+            True if key was found and deleted
+        """
+        path = []
+        node = self.root
+        while node and node.val != key:
+            path.append(node)
+            node = node.left if key < node.val else node.right
+        if node is None:
+            return False
+
+        if node.left and node.right:
+            # Replace value with the in-order successor and delete that
+            path.append(node)
+            successor = node.right
+            while successor.left:
+                path.append(successor)
+                successor = successor.left
+            node.val = successor.val
+            node = successor
+
+        child = node.left or node.right
+        if not path:
+            self.root = child
+        elif path[-1].left is node:
+            path[-1].left = child
+        else:
+            path[-1].right = child
+        self.size -= 1
+        self._retrace(path)
+        return True
+
+    def _retrace(self, path: list) -> None:
+        """Rebalance nodes on path from the bottom up to the root."""
+        for i in reversed(range(len(path))):
+            node = path[i]
+            old_height = node.height
+            subtree = _rebalance(node)
+            if subtree is node:
+                # Nothing above changes once a subtree keeps its height
+                if node.height == old_height:
+                    break
+                continue
+            if i == 0:
+                self.root = subtree
+            elif path[i - 1].left is node:
+                path[i - 1].left = subtree
+            else:
+                path[i - 1].right = subtree
 
 
 def rgb565_to_hex(rgb565: int) -> str:
@@ -89,100 +317,212 @@ def rgb565_to_hex(rgb565: int) -> str:
     return f"#{r8:02X}{g8:02X}{b8:02X}"
 
 
-def dfs_traversal(root, elements_num):
+# RGB565 shades of green as #RRGGBB, indexed by the 6-bit green channel
+GREEN_SHADES = tuple(rgb565_to_hex(green << 5) for green in range(64))
+
+
+def colour_visitor(elements_num):
     """
-    Depth-First Search traversal using a stack (iterative).
-    Changes node colors (RGB565) during traversal. Use shades of green
-    from dark to light to show the order of visiting nodes.
+    Create a visitor that colours nodes in visiting order with shades of
+    green from dark to light, taken from the GREEN_SHADES table.
     Args:
-        root: Root node of the binary tree
         elements_num: Total number of elements in the tree
     Returns:
-        List of visited node values in DFS order
+        Function that colours the node passed to it
     """
-    if root is None:
-        return []
-
-    visited = []
-    stack = [root]
-    # Initial colour in RGB565 format (dark green)
-    colour = 512
+    # Initial green channel value (dark green, 512 in RGB565)
+    green = 16
     # Colour step size depends on number of elements and initial colour
-    colour_step = int(48 / elements_num) if elements_num < 48 else 1
+    step = int(48 / elements_num) if elements_num < 48 else 1
 
-    while stack:
-        # Pop from stack (LIFO - Last In First Out)
-        node = stack.pop()
+    def visit(node):
+        nonlocal green
+        node.color = GREEN_SHADES[green]
+        # If tree is large, restart from dark green to avoid overflow
+        if green == 63:
+            green = 16
+        green += step
+        # More nodes than elements_num would step past the table
+        if green > 63:
+            green = 16
 
-        if node is None:
-            continue
-
-        # Add to visited list
-        visited.append(node.val)
-        node.color = rgb565_to_hex(colour)
-        # If tree is large, reset colour to avoid green colour overflow
-        # in RGB565
-        if colour == 2016:
-            colour = 512
-        # Make colour lighter for the next nodes
-        colour += ((0 << 11) | (colour_step << 5) | 0)
+    return visit
 
-        # Mark as visited (change color)
-        # node.color = visited_color
 
+def iter_preorder(root, visit=None):
+    """
+    Lazily yield nodes in pre-order (root, left, right) using a stack.
+    Args:
+        root: Root node of the binary tree
+        visit: Optional function called with every node before it is
+               yielded
+    """
+    stack = [root] if root else []
+    while stack:
+        # Pop from stack (LIFO - Last In First Out)
+        node = stack.pop()
+        if visit:
+            visit(node)
+        yield node
         # Push right child first, then left (so left is processed first)
         if node.right:
             stack.append(node.right)
         if node.left:
             stack.append(node.left)
 
-    return visited
+
+def iter_inorder(root, visit=None):
+    """
+    Lazily yield nodes in in-order (left, root, right) using a stack.
+    Args:
+        root: Root node of the binary tree
+        visit: Optional function called with every node before it is
+               yielded
+    """
+    stack = []
+    node = root
+    while stack or node:
+        while node:
+            stack.append(node)
+            node = node.left
+        node = stack.pop()
+        if visit:
+            visit(node)
+        yield node
+        node = node.right
 
 
-def bfs_traversal(root, elements_num):
+def iter_postorder(root, visit=None):
     """
-    Breadth-First Search traversal using a queue (iterative).
-    Changes node colors (RGB565) during traversal. Use shades of green
-    from dark to light to show the order of visiting nodes.
+    Lazily yield nodes in post-order (left, right, root) using a stack.
     Args:
         root: Root node of the binary tree
-        elements_num: Total number of elements in the tree
-    Returns:
-        List of visited node values in BFS order
+        visit: Optional function called with every node before it is
+               yielded
     """
-    if root is None:
-        return []
+    stack = []
+    node = root
+    last = None
+    while stack or node:
+        if node:
+            stack.append(node)
+            node = node.left
+            continue
+        top = stack[-1]
+        if top.right and top.right is not last:
+            node = top.right
+        else:
+            if visit:
+                visit(top)
+            yield top
+            last = stack.pop()
 
-    visited = []
-    queue = deque([root])
-    # Initial colour in RGB565 (dark green)
-    colour = 512
-    # Colour step size depends on number of elements and initial colour
-    colour_step = int(48 / elements_num) if elements_num < 48 else 1
 
+def iter_levelorder(root, visit=None):
+    """
+    Lazily yield nodes level by level using a queue.
+    Args:
+        root: Root node of the binary tree
+        visit: Optional function called with every node before it is
+               yielded
+    """
+    queue = deque([root] if root else [])
     while queue:
         # Dequeue from front (FIFO - First In First Out)
         node = queue.popleft()
-        if node is None:
-            continue
-        node.color = rgb565_to_hex(colour)
-        # If tree is large, reset colour to avoid green colour overflow
-        # in RGB565
-        if colour == 2016:
-            colour = 512
-        # Make colour lighter for the next nodes
-        colour += ((0 << 11) | (colour_step << 5) | 0)
-
-        # Add to visited list
-        visited.append(node.val)
-
+        if visit:
+            visit(node)
+        yield node
         # Enqueue children (left first, then right)
         if node.left:
             queue.append(node.left)
         if node.right:
             queue.append(node.right)
 
-    return visited
+
+def morris_inorder(root, visit=None):
+    """
+    Lazily yield nodes in in-order with O(1) extra memory (Morris).
+    The tree is temporarily threaded through empty right links while
+    the generator runs. If it is closed early, the rest of the walk is
+    finished without yielding so that the tree is restored.
+    Args:
+        root: Root node of the binary tree
+        visit: Optional function called with every node before it is
+               yielded
+    """
+    node = root
+    try:
+        while node:
+            if node.left is None:
+                if visit:
+                    visit(node)
+                yield node
+                node = node.right
+                continue
+            predecessor = node.left
+            while predecessor.right and predecessor.right is not node:
+                predecessor = predecessor.right
+            if predecessor.right is None:
+                # Thread back to node, then descend into the left subtree
+                predecessor.right = node
+                node = node.left
+            else:
+                predecessor.right = None
+                if visit:
+                    visit(node)
+                yield node
+                node = node.right
+    finally:
+        # Interrupted at a yielded node: continue after it, unthreading
+        node = node.right if node else None
+        while node:
+            if node.left is None:
+                node = node.right
+                continue
+            predecessor = node.left
+            while predecessor.right and predecessor.right is not node:
+                predecessor = predecessor.right
+            if predecessor.right is None:
+                predecessor.right = node
+                node = node.left
+            else:
+                predecessor.right = None
+                node = node.right
+
+
+def dfs_traversal(root, elements_num):
+    """
+    Depth-First Search traversal using a stack (iterative).
+    Changes node colors (RGB565) during traversal. Use shades of green
+    from dark to light to show the order of visiting nodes.
+    Args:
+        root: Root node of the binary tree
+        elements_num: Total number of elements in the tree
+    Returns:
+        List of visited node values in DFS order
+    """
+    if root is None:
+        return []
+    visit = colour_visitor(elements_num)
+    return [node.val for node in iter_preorder(root, visit)]
+
+
+def bfs_traversal(root, elements_num):
+    """
+    Breadth-First Search traversal using a queue (iterative).
+    Changes node colors (RGB565) during traversal. Use shades of green
+    from dark to light to show the order of visiting nodes.
+    Args:
+        root: Root node of the binary tree
+        elements_num: Total number of elements in the tree
+    Returns:
+        List of visited node values in BFS order
+    """
+    if root is None:
+        return []
+    visit = colour_visitor(elements_num)
+    return [node.val for node in iter_levelorder(root, visit)]
 
 
 def main():
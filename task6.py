@@ -1,67 +1,469 @@
 """Using greedy and dynamic programming algorithms to solve the
    knapsack problem"""
 
+import math
+import time
+from bisect import bisect_right
+from collections import OrderedDict, namedtuple
+import numpy as np
+
+# Number of item catalogues whose solvers get_solver keeps
+SOLVER_CACHE_SIZE = 8
+_SOLVER_CACHE = OrderedDict()
+# solve_knapsack uses DP up to this many (items x budget) table cells
+DP_CELL_LIMIT = 200_000_000
+# Working rows of a DP take about as much memory as this many table rows
+# (decision bits): two 64-bit rows per budget unit
+DP_ROW_CELLS = 128
+# solve_knapsack gives branch-and-bound up to this many search nodes
+BNB_NODE_LIMIT = 1_000_000
+# Result of solve_knapsack; epsilon bounds the relative loss of calories
+# against the optimum, None if the result is exact
+KnapsackResult = namedtuple(
+    "KnapsackResult",
+    ["products", "total_cost", "total_calories", "method", "epsilon",
+     "elapsed"]
+)
+
+
+class KnapsackSolver:
+    """
+    Dynamic programming knapsack solver for one item catalogue and many
+    budgets. One DP pass up to the largest budget answers every smaller
+    budget too: best[c] is the optimum for cost limit c, and the
+    bit-packed decisions (1 bit per item and cost) recover the items
+    for any limit. Items can be added later, each costing one more row.
+    """
+    def __init__(self, data: dict, capacity: int = 0):
+        """
+        Args:
+            data: items {name: {"cost": int, "calories": number}}
+            capacity: largest budget to prepare for, it grows on demand
+        """
+        self.names = []
+        self._known = set()
+        self.costs = []
+        self.calories = []
+        self.capacity = capacity
+        # best[c] = max calories using items added so far with cost limit c
+        self._best = np.zeros(capacity + 1, dtype=np.int64)
+        # Bit c of _taken[i] is set if item i improves the result for c
+        self._taken = []
+        self.add_items(data)
+
+    def __len__(self):
+        return len(self.names)
+
+    def add_items(self, data: dict) -> None:
+        """
+        Add items to the catalogue, updating the DP row for each.
+        Raises:
+            ValueError: if an item with the same name exists
+        """
+        for name, item in data.items():
+            if name in self._known:
+                raise ValueError(f"Item '{name}' already exists")
+            self._known.add(name)
+            if not isinstance(item["calories"], int):
+                self._best = self._best.astype(np.float64)
+            self.names.append(name)
+            self.costs.append(item["cost"])
+            self.calories.append(item["calories"])
+            self._add_row(item["cost"], item["calories"])
+
+    def _add_row(self, cost: int, calories) -> None:
+        """Update the DP row with one item and store its decisions."""
+        if cost > self.capacity:
+            self._taken.append(None)
+            return
+        best = self._best
+        candidate = best[:self.capacity + 1 - cost] + calories
+        improved = np.zeros(self.capacity + 1, dtype=bool)
+        np.greater(candidate, best[cost:], out=improved[cost:])
+        best[cost:][improved[cost:]] = candidate[improved[cost:]]
+        self._taken.append(np.packbits(improved))
+
+    def _grow(self, capacity: int) -> None:
+        """Rebuild the DP for a larger capacity, at least doubling it."""
+        self.capacity = max(capacity, 2 * self.capacity)
+        self._best = np.zeros(self.capacity + 1, dtype=self._best.dtype)
+        self._taken = []
+        for cost, calories in zip(self.costs, self.calories):
+            self._add_row(cost, calories)
+
+    def solve(self, max_cost: int) -> tuple[list[str], int, int]:
+        """
+        Choose dishes with maximum calories within max_cost.
+        Raises:
+            ValueError: if max_cost is negative
+        """
+        return self.solve_many([max_cost])[0]
+
+    def solve_many(self, budgets) -> list[tuple[list[str], int, int]]:
+        """
+        Answer a batch of budgets from a single DP pass.
+        Returns:
+            (products, total cost, total calories) for every budget
+        Raises:
+            ValueError: if a budget is negative
+        """
+        budgets = list(budgets)
+        if any(budget < 0 for budget in budgets):
+            raise ValueError("Budget cannot be negative")
+        if budgets and max(budgets) > self.capacity:
+            self._grow(max(budgets))
+        return [self._recover(budget) for budget in budgets]
+
+    def _recover(self, max_cost: int) -> tuple[list[str], int, int]:
+        """Recover selected items for one budget."""
+        products = []
+        total_calories = self._best[max_cost].item()
+        total_cost = 0
+
+        c = max_cost
+        for i in range(len(self.names) - 1, -1, -1):
+            taken = self._taken[i]
+            # If value comes from using this item
+            if taken is not None and taken[c >> 3] >> (7 - (c & 7)) & 1:
+                products.append(self.names[i])
+                c -= self.costs[i]
+                total_cost += self.costs[i]
+
+        # To restore original order
+        products.reverse()
+
+        return products, total_cost, total_calories
+
+
+def get_solver(data: dict) -> KnapsackSolver:
+    """
+    Return a KnapsackSolver for the catalogue, reusing a cached one if
+    the same items were seen before.
+    """
+    key = tuple((name, item["cost"], item["calories"])
+                for name, item in data.items())
+    solver = _SOLVER_CACHE.get(key)
+    # Items added to a cached solver make it a different catalogue
+    if solver is None or len(solver) != len(key):
+        solver = KnapsackSolver(data)
+        _SOLVER_CACHE[key] = solver
+        if len(_SOLVER_CACHE) > SOLVER_CACHE_SIZE:
+            _SOLVER_CACHE.popitem(last=False)
+    _SOLVER_CACHE.move_to_end(key)
+    return solver
+
 
 def dynamic_programming(data: dict, max_cost: int) -> tuple[list[str], int, int]:
-    """Choose dishes with maximum calories using dynamic programming approach"""
-    # Convert dictionary to list for DP
-    names = list(data.keys())
-    costs = [data[name]["cost"] for name in names]
-    calories = [data[name]["calories"] for name in names]
-    n = len(names)
-
-    # DP table: dp[i][c] = max calories using first i items with cost limit c
-    dp = [[0] * (max_cost + 1) for _ in range(n + 1)]
-
-    # Build DP table
-    for i in range(1, n + 1):
-        for c in range(max_cost + 1):
-            if costs[i-1] <= c:
-                dp[i][c] = max(dp[i-1][c], dp[i-1][c - costs[i-1]] + calories[i-1])
-            else:
-                dp[i][c] = dp[i-1][c]
+    """
+    Choose dishes with maximum calories using dynamic programming approach.
+    Keeps one row of the DP table as a NumPy array and updates it for
+    every item with a single vectorized shift-and-compare.
+    """
+    return KnapsackSolver(data, max_cost).solve(max_cost)
 
-    # Recover selected items
-    products = []
-    total_calories = dp[n][max_cost]
-    total_cost = 0
 
-    c = max_cost
-    for i in range(n, 0, -1):
-        # If value comes from using this item
-        if dp[i][c] != dp[i-1][c]:
-            products.append(names[i-1])
-            c -= costs[i-1]
-            total_cost += costs[i-1]
+def _useful_items(data: dict, max_cost: int) -> list[tuple]:
+    """
+    Items that fit the budget and add calories, as (index, name, cost,
+    calories), ordered by calories to cost ratio in descending order.
+    """
+    items = [
+        (i, name, item["cost"], item["calories"])
+        for i, (name, item) in enumerate(data.items())
+        if item["cost"] <= max_cost and item["calories"] > 0
+    ]
+    items.sort(key=lambda el: el[3] / el[2] if el[2] else math.inf,
+               reverse=True)
+    return items
 
-    # To restore original order
-    products.reverse()
 
-    return products, total_cost, total_calories
+def _result(items: list[tuple], chosen) -> tuple[list[str], int, int]:
+    """Names in original order, total cost and calories of chosen items."""
+    picked = sorted((items[i] for i in chosen), key=lambda el: el[0])
+    return ([el[1] for el in picked], sum(el[2] for el in picked),
+            sum(el[3] for el in picked))
 
 
-def greedy_algorithm(data: dict, max_cost: int) -> tuple[list[str], int, int]:
-    """Choose dishes with maximum calories to cost ratio using greedy approach"""
+def branch_and_bound(data: dict, max_cost: int,
+                     node_limit: int | None = None):
+    """
+    Choose dishes with maximum calories using exact branch and bound.
+    Items are explored in greedy ratio order, taking an item before
+    skipping it. A branch is pruned when its fractional relaxation bound
+    (the greedy fill with a fraction of the first item that doesn't
+    fit) can't beat the best solution found so far. Work depends on n
+    and on the data, not on the size of max_cost.
+    Args:
+        data: items {name: {"cost": int, "calories": number}}
+        max_cost: budget
+        node_limit: give up after exploring this many search nodes
+    Returns:
+        (products, total cost, total calories), or None if node_limit
+        was reached before the optimum was proven
+    """
+    items = _useful_items(data, max_cost)
+    chosen, value, upper_bound = _branch_and_bound(items, max_cost,
+                                                   node_limit)
+    if upper_bound > value:
+        return None
+    return _result(items, chosen)
+
+
+def _branch_and_bound(items: list[tuple], max_cost: int,
+                      node_limit: int | None):
+    """
+    Search behind branch_and_bound over items from _useful_items.
+    Returns:
+        (indices of the best items found, their calories, upper bound
+        of the optimum); the bound equals the calories once the search
+        is complete
+    """
+    costs = [el[2] for el in items]
+    calories = [el[3] for el in items]
+    n = len(items)
+    # Prefix sums give the fractional bound in O(log n)
+    cost_sums = [0]
+    calorie_sums = [0]
+    for cost, value in zip(costs, calories):
+        cost_sums.append(cost_sums[-1] + cost)
+        calorie_sums.append(calorie_sums[-1] + value)
+
+    def bound(i, budget, value):
+        """Fractional relaxation bound for items i.. with budget left."""
+        j = bisect_right(cost_sums, cost_sums[i] + budget) - 1
+        value += calorie_sums[j] - calorie_sums[i]
+        if j < n:
+            budget -= cost_sums[j] - cost_sums[i]
+            value += calories[j] * budget / costs[j]
+        return value
+
+    # Greedy solution is the first incumbent
+    best_value = 0
+    best_chosen = None
+    budget = max_cost
+    for i in range(n):
+        if costs[i] <= budget:
+            budget -= costs[i]
+            best_value += calories[i]
+            best_chosen = (i, best_chosen)
+
+    # Search nodes (next item, budget left, value, chosen items as a
+    # linked list of (index, rest))
+    stack = [(0, max_cost, 0, None)]
+    upper_bound = None
+    explored = 0
+    while stack:
+        i, budget, value, chosen = stack.pop()
+        explored += 1
+        if node_limit is not None and explored > node_limit:
+            # Every unseen solution is under one of the open nodes
+            stack.append((i, budget, value, chosen))
+            upper_bound = max(best_value, max(
+                bound(*node[:3]) for node in stack))
+            break
+        if value > best_value:
+            best_value, best_chosen = value, chosen
+        if i == n or bound(i, budget, value) <= best_value:
+            continue
+        stack.append((i + 1, budget, value, chosen))
+        if costs[i] <= budget:
+            stack.append((i + 1, budget - costs[i], value + calories[i],
+                          (i, chosen)))
+
+    chosen = []
+    while best_chosen is not None:
+        index, best_chosen = best_chosen
+        chosen.append(index)
+    if upper_bound is None:
+        upper_bound = best_value
+    return chosen, best_value, upper_bound
+
+
+def fptas(data: dict, max_cost: int,
+          epsilon: float = 0.1) -> tuple[list[str], int, int]:
+    """
+    Choose dishes with at least (1 - epsilon) of the maximum calories.
+    Calories are scaled down to integers by epsilon * LB / n, where LB
+    is a lower bound of the optimum (the better of the greedy fill and
+    the best single item). A DP over scaled calories, up to 2 * LB,
+    finds the minimum cost of each total. Work is O(n^2 / epsilon) and
+    doesn't depend on max_cost.
+    Args:
+        data: items {name: {"cost": int, "calories": number}}
+        max_cost: budget
+        epsilon: allowed relative loss of calories, 0 < epsilon < 1
+    Returns:
+        (products, total cost, total calories)
+    Raises:
+        ValueError: if epsilon is not in (0, 1)
+    """
+    if not 0 < epsilon < 1:
+        raise ValueError("epsilon must be between 0 and 1")
+    items = _useful_items(data, max_cost)
+    if not items:
+        return [], 0, 0
+
+    greedy_value = 0
+    budget = max_cost
+    for _, _, cost, value in items:
+        if cost <= budget:
+            budget -= cost
+            greedy_value += value
+    lower_bound = max(greedy_value, max(el[3] for el in items))
+    scale = epsilon * lower_bound / len(items)
+    # The optimum is at most 2 * lower_bound
+    total = int(2 * lower_bound // scale) + 1
+    scaled = [min(int(el[3] // scale), total) for el in items]
+
+    # min_cost[q] = min cost of items seen so far with scaled calories q
+    min_cost = np.full(total + 1, np.inf)
+    min_cost[0] = 0
+    # Bit q of taken[i] is set if item i lowers the cost of total q
+    taken = []
+    improved = np.zeros(total + 1, dtype=bool)
+    for (_, _, cost, _), value in zip(items, scaled):
+        candidate = min_cost[:total + 1 - value] + cost
+        improved[:value] = False
+        np.less(candidate, min_cost[value:], out=improved[value:])
+        min_cost[value:][improved[value:]] = candidate[improved[value:]]
+        taken.append(np.packbits(improved))
+
+    q = int(np.flatnonzero(min_cost <= max_cost)[-1])
+    chosen = []
+    for i in range(len(items) - 1, -1, -1):
+        if taken[i][q >> 3] >> (7 - (q & 7)) & 1:
+            chosen.append(i)
+            q -= scaled[i]
+    return _result(items, chosen)
+
+
+def solve_knapsack(data: dict, max_cost: int, method: str = "auto",
+                   epsilon: float = 0.1) -> KnapsackResult:
+    """
+    Choose dishes with maximum calories with the best suited engine.
+    "auto" uses dynamic programming while the table (items x budget)
+    together with its working rows (DP_ROW_CELLS) has at most
+    DP_CELL_LIMIT cells. Beyond that it runs branch and bound for up to
+    BNB_NODE_LIMIT nodes. If the search isn't finished by then and its
+    proven gap is above epsilon, FPTAS runs with the requested epsilon
+    when its table fits DP_CELL_LIMIT cells. Otherwise the best
+    branch-and-bound solution is returned with its proven gap as the
+    epsilon of the result, which may then exceed the requested one.
+    Args:
+        data: items {name: {"cost": int, "calories": number}}
+        max_cost: budget
+        method: "auto", "dp", "branch_and_bound" or "fptas"
+        epsilon: allowed relative loss of calories for FPTAS
+    Returns:
+        KnapsackResult with the chosen items, the method used, the
+        guaranteed relative loss of calories (None if exact) and
+        elapsed seconds
+    Raises:
+        ValueError: if method is unknown or epsilon is not in (0, 1)
+    """
+    if method not in ("auto", "dp", "branch_and_bound", "fptas"):
+        raise ValueError(f"Unknown method: '{method}'")
+    if method in ("auto", "fptas") and not 0 < epsilon < 1:
+        raise ValueError("epsilon must be between 0 and 1")
+    start = time.perf_counter()
+    result = None
+    gap = None
+
+    if method == "auto":
+        if (len(data) + DP_ROW_CELLS) * (max_cost + 1) <= DP_CELL_LIMIT:
+            method = "dp"
+        else:
+            items = _useful_items(data, max_cost)
+            chosen, value, upper_bound = _branch_and_bound(
+                items, max_cost, BNB_NODE_LIMIT)
+            gap = 1 - value / upper_bound if upper_bound > value else None
+            # The FPTAS table has about 2 * n / epsilon columns
+            n = len(items)
+            fptas_cells = (n + DP_ROW_CELLS) * (2 * n / epsilon + 1)
+            if gap is None or gap <= epsilon or fptas_cells > DP_CELL_LIMIT:
+                method = "branch_and_bound"
+                result = _result(items, chosen)
+            else:
+                method = "fptas"
+
+    if method == "dp":
+        result = dynamic_programming(data, max_cost)
+    elif method == "branch_and_bound" and result is None:
+        result = branch_and_bound(data, max_cost)
+    elif method == "fptas":
+        result = fptas(data, max_cost, epsilon)
+        gap = epsilon
+
+    return KnapsackResult(*result, method, gap,
+                          time.perf_counter() - start)
+
+
+def greedy_arrays(costs, calories, max_cost: int, names=None):
+    """
+    Choose items with maximum calories to cost ratio using greedy
+    approach, for columnar input.
+    Ratios are computed in one NumPy array and items are ordered lazily:
+    the best-ratio candidates are picked with argpartition in growing
+    batches, and only they are sorted. The scan stops once no remaining
+    item fits the budget. The input is never modified.
+    Args:
+        costs: item costs (sequence or NumPy array)
+        calories: item calories, parallel to costs
+        max_cost: budget
+        names: optional item names, parallel to costs
+    Returns:
+        (products, total cost, total calories): products are names if
+        given, item indices otherwise, in greedy order
+    """
+    costs = np.asarray(costs)
+    calories = np.asarray(calories)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ratios = calories / costs
+    # Items with zero cost and calories have no ratio: they go last
+    ratios[np.isnan(ratios)] = -np.inf
+
+    chosen = []
     ret_cost = 0
-    products = []
     ret_calories = 0
+    remaining = np.arange(len(costs))
+    batch_size = 64
+    while remaining.size and costs[remaining].min() <= max_cost:
+        if remaining.size > batch_size:
+            best = np.argpartition(-ratios[remaining], batch_size - 1)
+            threshold = ratios[remaining[best[:batch_size]]].min()
+            # Take ties too, so equal ratios keep their input order
+            in_batch = ratios[remaining] >= threshold
+            batch = remaining[in_batch]
+            remaining = remaining[~in_batch]
+        else:
+            batch = remaining
+            remaining = remaining[:0]
+        # Ratio in descending order, then input order
+        batch = batch[np.lexsort((batch, -ratios[batch]))]
 
-    # Add ratio field to the data dictionary
-    for key in data.keys():
-        data[key]["ratio"] = data[key]["calories"]/data[key]["cost"]
+        for i, el_cost, el_calories in zip(batch.tolist(),
+                                           costs[batch].tolist(),
+                                           calories[batch].tolist()):
+            if el_cost <= max_cost:
+                chosen.append(i)
+                max_cost -= el_cost
+                ret_cost += el_cost
+                ret_calories += el_calories
+        batch_size *= 4
 
-    # Sort data by ratio in descending order
-    sort_data = sorted(data.items(), key=lambda val: val[1]["ratio"], reverse=True)
+    products = chosen if names is None else [names[i] for i in chosen]
+    return products, ret_cost, ret_calories
 
-    for el in sort_data:
-        el_cost = el[1]["cost"]
-        if el_cost < max_cost:
-            products.append(el[0])
-            max_cost -= el_cost
-            ret_cost += el_cost
-            ret_calories += el[1]["calories"]
 
-    return products, ret_cost, ret_calories
+def greedy_algorithm(data: dict, max_cost: int) -> tuple[list[str], int, int]:
+    """
+    Choose dishes with maximum calories to cost ratio using greedy approach.
+    Doesn't modify data, so it is safe to share it between threads.
+    """
+    names = list(data.keys())
+    return greedy_arrays([data[name]["cost"] for name in names],
+                         [data[name]["calories"] for name in names],
+                         max_cost, names)
 
 
 def main():
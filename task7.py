@@ -1,38 +1,160 @@
 """Simulates rolling two dice multiple times and shows frequency
    distribution"""
 
-import random
+from collections import namedtuple
+from multiprocessing import Pool
+
 import matplotlib.pyplot as plt
+import numpy as np
+
+# Number of rolls drawn at once, bounds memory use to about
+# CHUNK_SIZE * n_dice bytes for dice with up to 256 sides
+CHUNK_SIZE = 1_000_000
+# From this number of dice exact_distribution uses FFT instead of
+# repeated convolution
+FFT_THRESHOLD = 32
+
+DiceProgress = namedtuple("DiceProgress", ["rolls", "result", "distance"])
+
+
+def _iter_counts(rng: np.random.Generator, repeat: int, n_dice: int,
+                 sides: int, chunk_size: int):
+    """Rolls dice in chunks and yields counts of sums for every chunk
+    Args:
+        rng: random generator to draw rolls from
+        repeat (int): Number of rolls
+        n_dice (int): Number of dice in one roll
+        sides (int): Number of sides of every die
+        chunk_size (int): Maximum number of rolls in one chunk
+    Yields:
+        np.ndarray: Counts of the sums in the chunk, index 0 is the sum
+                    n_dice, the last index is the sum n_dice * sides.
+    """
+    dtype = np.uint8 if sides <= 256 else np.int64
+    length = n_dice * (sides - 1) + 1
+    while repeat > 0:
+        rows = min(repeat, chunk_size)
+        # Faces are drawn from 0, so sums start from 0 as well
+        rolls = rng.integers(0, sides, size=(rows, n_dice), dtype=dtype)
+        yield np.bincount(rolls.sum(axis=1, dtype=np.int64),
+                          minlength=length)
+        repeat -= rows
+
+
+def _count_sums(seed, repeat: int, n_dice: int, sides: int,
+                chunk_size: int) -> np.ndarray:
+    """Returns total counts of sums for repeat rolls from the seed"""
+    counts = np.zeros(n_dice * (sides - 1) + 1, dtype=np.int64)
+    rng = np.random.default_rng(seed)
+    for chunk in _iter_counts(rng, repeat, n_dice, sides, chunk_size):
+        counts += chunk
+    return counts
+
+
+def _to_percents(counts: np.ndarray, n_dice: int, repeat: int) -> dict:
+    """Converts counts of sums to the dictionary of percents"""
+    return {n_dice + k: v * (100 / repeat)
+            for k, v in enumerate(counts.tolist())}
 
 
-def dice(repeat: int) -> dict:
-    """Simulates rolling two dice multiple times
+def dice(repeat: int, n_dice: int = 2, sides: int = 6, *, seed=None,
+         chunk_size: int = CHUNK_SIZE, workers: int | None = None) -> dict:
+    """Simulates rolling dice multiple times
     Args:
-        repeat (int): Number of times to roll two dices
+        repeat (int): Number of times to roll the dice
+        n_dice (int): Number of dice rolled at once
+        sides (int): Number of sides of every die
+        seed: Seed for np.random.SeedSequence, None for a random one
+        chunk_size (int): Maximum number of rolls kept in memory
+        workers (int | None): Number of processes, None to roll
+            in the current process. Every worker gets its own stream
+            spawned from the seed, so results are reproducible for the
+            same seed and number of workers.
     Returns:
-        dict: Dictionary with the sum of the two dices as the key
-              and the frequency of the sum as the value.
+        dict: Dictionary with the sum of the dice as the key
+              and the frequency of the sum in percents as the value.
     """
-    result = {x: 0 for x in range(2, 13)}
-    for _ in range(repeat):
-        val = [random.randint(1, 6) for _ in range(2)]
-        result[sum(val)] += 1
+    seed_seq = np.random.SeedSequence(seed)
+    if workers is None:
+        counts = _count_sums(seed_seq, repeat, n_dice, sides, chunk_size)
+    else:
+        shares = [repeat // workers + (i < repeat % workers)
+                  for i in range(workers)]
+        tasks = [(child, share, n_dice, sides, chunk_size)
+                 for child, share in zip(seed_seq.spawn(workers), shares)]
+        with Pool(workers) as pool:
+            counts = sum(pool.starmap(_count_sums, tasks))
 
-    result = {k: v * (100 / repeat) for k, v in result.items()}
+    return _to_percents(counts, n_dice, repeat)
 
-    return result
+
+def _exact_pmf(n_dice: int, sides: int) -> np.ndarray:
+    """Returns probabilities of the sums, index 0 is the sum n_dice"""
+    die = np.full(sides, 1 / sides)
+    if n_dice < FFT_THRESHOLD:
+        pmf = np.ones(1)
+        for _ in range(n_dice):
+            pmf = np.convolve(pmf, die)
+        return pmf
+
+    # The sum is the n_dice-th power of the die polynomial
+    length = n_dice * (sides - 1) + 1
+    pmf = np.fft.irfft(np.fft.rfft(die, length) ** n_dice, length)
+    # Round-off leaves tiny negative values on the tails
+    np.clip(pmf, 0, None, out=pmf)
+    return pmf / pmf.sum()
+
+
+def exact_distribution(n_dice: int = 2, sides: int = 6) -> dict:
+    """Calculates exact distribution of the sum of dice
+    Args:
+        n_dice (int): Number of dice rolled at once
+        sides (int): Number of sides of every die
+    Returns:
+        dict: Dictionary with the sum of the dice as the key
+              and the probability of the sum in percents as the value.
+    """
+    return {n_dice + k: v * 100
+            for k, v in enumerate(_exact_pmf(n_dice, sides).tolist())}
+
+
+def iter_dice(repeat: int, n_dice: int = 2, sides: int = 6, *, seed=None,
+              chunk_size: int = CHUNK_SIZE, tolerance: float = 0.0):
+    """Simulates rolling dice and reports convergence after every chunk
+    Args:
+        repeat (int): Maximum number of times to roll the dice
+        n_dice (int): Number of dice rolled at once
+        sides (int): Number of sides of every die
+        seed: Seed for np.random.SeedSequence, None for a random one
+        chunk_size (int): Number of rolls between reports
+        tolerance (float): Stop once the distance to the exact
+            distribution is at most tolerance
+    Yields:
+        DiceProgress: Number of rolls so far, the running result in the
+            format of dice() and the total variation distance (from 0 to 1)
+            between the running and the exact distributions.
+    """
+    pmf = _exact_pmf(n_dice, sides)
+    counts = np.zeros(len(pmf), dtype=np.int64)
+    rolls = 0
+    rng = np.random.default_rng(np.random.SeedSequence(seed))
+    for chunk in _iter_counts(rng, repeat, n_dice, sides, chunk_size):
+        counts += chunk
+        rolls += int(chunk.sum())
+        distance = 0.5 * np.abs(counts / rolls - pmf).sum()
+        yield DiceProgress(rolls, _to_percents(counts, n_dice, rolls),
+                           distance)
+        if distance <= tolerance:
+            return
 
 
 def main():
     """Main function to simulate rolling two dice multiple times
     and show frequency distribution"""
 
-    ref_data = {2: 2.78,  3: 5.56,  4: 8.33,  5: 11.11, 6: 13.89,
-                7: 16.67, 8: 13.89, 9: 11.11, 10: 8.33, 11: 5.56,
-                12: 2.78}
+    ref_data = exact_distribution(2, 6)
     repeat = 1000
-    random.seed(42)
-    result = dice(repeat)
+    result = dice(repeat, seed=42)
 
     # Prepare data for plotting
     x = list(range(2, 13))